@@ -10,6 +10,7 @@ from database import (
     db,
     load_subjects_from_db,
     load_teachers_from_db,
+    load_teacher_qualifications_from_db,
     load_rooms_from_db,
     load_sections_from_db,
     get_pending_users,
@@ -155,21 +156,224 @@ class MaintenanceMiddleware(BaseHTTPMiddleware):
 # Add maintenance middleware
 app.add_middleware(MaintenanceMiddleware)
 
-# Mount static files with no-cache headers
-from fastapi.staticfiles import StaticFiles
+# Read-your-writes for read replicas: after a request writes, the client's reads
+# stay on the primary for REPLICA_STICKY_SECONDS (covers replication lag)
+REPLICA_STICKY_COOKIE = 'db_primary_until'
+REPLICA_STICKY_SECONDS = int(os.getenv('REPLICA_STICKY_SECONDS', '10'))
 
-class NoCacheStaticFiles(StaticFiles):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-    
-    def file_response(self, *args, **kwargs):
-        response = super().file_response(*args, **kwargs)
-        response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
-        response.headers["Pragma"] = "no-cache"
-        response.headers["Expires"] = "0"
+class ReplicaStickinessMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        import time
+        from database import begin_request_routing, db
+        try:
+            pinned_until = float(request.cookies.get(REPLICA_STICKY_COOKIE) or 0)
+        except ValueError:
+            pinned_until = 0
+        state = begin_request_routing(pinned=pinned_until > time.time())
+
+        response = await call_next(request)
+        if state['wrote'] and db.db.replica_urls:
+            response.set_cookie(
+                REPLICA_STICKY_COOKIE, str(int(time.time()) + REPLICA_STICKY_SECONDS),
+                max_age=REPLICA_STICKY_SECONDS, httponly=True, samesite='lax'
+            )
+        return response
+
+app.add_middleware(ReplicaStickinessMiddleware)
+
+def upload_limit_bytes() -> int:
+    """The max_file_upload_size_mb setting, in bytes"""
+    try:
+        max_mb = int(get_system_setting('max_file_upload_size_mb', '10'))
+    except (TypeError, ValueError):
+        max_mb = 10
+    return max_mb * 1024 * 1024
+
+# Enforce the upload size limit while the body arrives, before the multipart form is
+# parsed and spooled: a declared Content-Length over the limit is refused outright, and
+# a body that grows past it is cut off (the handler then sees a client disconnect)
+class UploadSizeLimitMiddleware:
+    def __init__(self, app, path_prefix: str = '/upload/'):
+        self.app = app
+        self.path_prefix = path_prefix
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not scope['path'].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+        from starlette.concurrency import run_in_threadpool
+        max_bytes = await run_in_threadpool(upload_limit_bytes)
+        # Read the setting once per upload: the handler picks it up from request.state
+        scope.setdefault('state', {})['upload_limit_bytes'] = max_bytes
+        too_large = JSONResponse(
+            status_code=413,
+            content={'detail': f'File exceeds the maximum upload size of {max_bytes // (1024 * 1024)} MB'}
+        )
+
+        content_length = dict(scope['headers']).get(b'content-length', b'')
+        if content_length.isdigit() and int(content_length) > max_bytes:
+            await too_large(scope, receive, send)
+            return
+
+        received = 0
+        rejected = False
+
+        async def limited_receive():
+            nonlocal received, rejected
+            if rejected:
+                return {'type': 'http.disconnect'}
+            message = await receive()
+            if message['type'] == 'http.request':
+                received += len(message.get('body', b''))
+                if received > max_bytes:
+                    rejected = True
+                    await too_large(scope, receive, send)
+                    return {'type': 'http.disconnect'}
+            return message
+
+        async def guarded_send(message):
+            if not rejected:
+                await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            if not rejected:
+                raise
+
+app.add_middleware(UploadSizeLimitMiddleware)
+
+# Importing the app touches neither the database nor OR-Tools; schema migrations and the
+# default users/settings run here (set DB_BOOTSTRAP_ON_STARTUP=false when a release step
+# runs `python migrations.py` instead)
+DB_BOOTSTRAP_ON_STARTUP = os.getenv('DB_BOOTSTRAP_ON_STARTUP', 'true').lower() != 'false'
+
+@app.on_event("startup")
+def bootstrap_database_on_startup():
+    if DB_BOOTSTRAP_ON_STARTUP:
+        from database import bootstrap_database
+        # Refuse to serve against a half-migrated schema; the restarted worker retries
+        if not bootstrap_database():
+            raise RuntimeError("Database bootstrap failed; see the migration errors above")
+
+RETENTION_INTERVAL_HOURS = float(os.getenv('RETENTION_INTERVAL_HOURS', '24'))
+
+async def retention_loop():
+    """Create upcoming log partitions and prune old data, once at startup and then periodically"""
+    import asyncio
+    from starlette.concurrency import run_in_threadpool
+    from database import run_retention_maintenance
+    while True:
+        await run_in_threadpool(run_retention_maintenance)
+        await asyncio.sleep(RETENTION_INTERVAL_HOURS * 3600)
+
+@app.on_event("startup")
+async def start_retention_maintenance():
+    import asyncio
+    if RETENTION_INTERVAL_HOURS > 0:
+        app.state.retention_task = asyncio.create_task(retention_loop())
+
+@app.on_event("shutdown")
+def flush_telemetry():
+    """Write any buffered activity logs and metrics before the process exits"""
+    from telemetry import shutdown_all
+    shutdown_all()
+
+# Mount static files. Fingerprinted build output (static/dist, see build_assets.py) is
+# immutable and served precompressed when the client accepts it; everything else is
+# revalidated on each use (ETag/Last-Modified -> 304).
+from fastapi.staticfiles import StaticFiles
+import mimetypes
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+PRECOMPRESSED = (('br', '.br'), ('gzip', '.gz'))
+
+class AssetStaticFiles(StaticFiles):
+    async def get_response(self, path: str, scope):
+        if path.startswith('dist/') or path.startswith('dist' + os.sep):
+            from fast_json import choose_encoding
+            siblings = {encoding: path + suffix for encoding, suffix in PRECOMPRESSED
+                        if os.path.isfile(os.path.join(self.directory, path + suffix))}
+            if siblings:
+                accepted = dict(scope.get('headers') or []).get(b'accept-encoding', b'').decode('latin-1')
+                encoding = choose_encoding(accepted, list(siblings))
+                if encoding is None:
+                    response = await super().get_response(path, scope)
+                else:
+                    response = await super().get_response(siblings[encoding], scope)
+                    media_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+                    if media_type.startswith('text/') or media_type == 'application/javascript':
+                        media_type += '; charset=utf-8'
+                    response.headers['Content-Type'] = media_type
+                    response.headers['Content-Encoding'] = encoding
+                # Caches must key every representation of this asset on Accept-Encoding
+                response.headers['Vary'] = 'Accept-Encoding'
+                return response
+        return await super().get_response(path, scope)
+
+    def file_response(self, full_path, *args, **kwargs):
+        response = super().file_response(full_path, *args, **kwargs)
+        if f"{os.sep}dist{os.sep}" in str(full_path) and f"{os.sep}pages{os.sep}" not in str(full_path):
+            response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        else:
+            response.headers["Cache-Control"] = "no-cache"
         return response
 
-app.mount('/static', NoCacheStaticFiles(directory='static'), name='static')
+app.mount('/static', AssetStaticFiles(directory='static'), name='static')
+
+BUILT_PAGES_DIR = os.path.join('static', 'dist', 'pages')
+
+def page_file(name: str) -> str:
+    """Path of an HTML page: the build_assets.py output when present, else the source"""
+    built = os.path.join(BUILT_PAGES_DIR, name)
+    return built if os.path.exists(built) else os.path.join('static', name)
+
+def page_response(path: str, **kwargs) -> FileResponse:
+    """Serve an HTML entry point; browsers revalidate it so new asset fingerprints are picked up"""
+    response = FileResponse(path, **kwargs)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+# Schedule, reference-data and listing payloads: fast JSON encoder plus gzip/brotli
+# negotiated from Accept-Encoding for bodies above JSON_COMPRESS_MIN_BYTES
+JSON_COMPRESS_MIN_BYTES = int(os.getenv('JSON_COMPRESS_MIN_BYTES', '1024'))
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        from fast_json import dumps
+        return dumps(content)
+
+    async def __call__(self, scope, receive, send):
+        if len(self.body) >= JSON_COMPRESS_MIN_BYTES and 'content-encoding' not in self.headers:
+            from fast_json import encode_body
+            accepted = dict(scope.get('headers') or []).get(b'accept-encoding', b'').decode('latin-1')
+            body, encoding = encode_body(self.body, accepted, JSON_COMPRESS_MIN_BYTES)
+            if encoding:
+                self.body = body
+                self.headers['Content-Encoding'] = encoding
+                self.headers['Content-Length'] = str(len(body))
+                if 'etag' in self.headers:
+                    from http_cache import coded_etag
+                    self.headers['ETag'] = coded_etag(self.headers['etag'], encoding)
+            self.headers.add_vary_header('Accept-Encoding')
+        await super().__call__(scope, receive, send)
+
+def compact_requested(request: Request) -> bool:
+    """?format=compact or an Accept header naming the compact media type (see schedule_codec.py)"""
+    from schedule_codec import wants_compact
+    return wants_compact(request.query_params.get('format'), request.headers.get('accept'))
+
+def schedule_response(request: Request, content, headers: Optional[dict] = None) -> FastJSONResponse:
+    """Schedule payload in the regular or, when requested, the columnar compact format"""
+    media_type = None
+    if compact_requested(request):
+        from schedule_codec import COMPACT_MEDIA_TYPE, compact_payload
+        compact = compact_payload(content)
+        if compact is not content:
+            content, media_type = compact, COMPACT_MEDIA_TYPE
+    response = FastJSONResponse(content=content, headers=headers, media_type=media_type)
+    response.headers.add_vary_header('Accept')
+    return response
 
 # JWT Configuration
 SECRET_KEY = os.getenv('SECRET_KEY', 'your-secret-key-change-in-production')  # Use environment variable
@@ -456,9 +660,9 @@ async def robots_txt():
 @app.get('/maintenance')
 async def maintenance_page():
     """Serve maintenance page when system is under maintenance"""
-    maintenance_path = os.path.join('static', 'maintenance.html')
+    maintenance_path = page_file('maintenance.html')
     if os.path.exists(maintenance_path):
-        return FileResponse(maintenance_path)
+        return page_response(maintenance_path)
     else:
         raise HTTPException(status_code=404, detail="Maintenance page not found")
 
@@ -466,56 +670,56 @@ async def maintenance_page():
 @app.get('/chair')
 async def chair_dashboard():
     """Chair dashboard with scheduling and data management - authentication handled by frontend"""
-    index_path = os.path.join('static', 'index.html')
+    index_path = page_file('index.html')
     if not os.path.exists(index_path):
         raise HTTPException(status_code=404, detail='Index file not found')
-    return FileResponse(index_path, media_type='text/html')
+    return page_response(index_path, media_type='text/html')
 
 # Admin route (placeholder for future admin functionality)
 @app.get('/admin')
 async def admin_dashboard():
     """Admin dashboard - placeholder for future admin functionality - authentication handled by frontend"""
-    admin_path = os.path.join('static', 'admin.html')
+    admin_path = page_file('admin.html')
     if not os.path.exists(admin_path):
         # Create a simple admin placeholder page
         
         with open(admin_path, 'w', encoding='utf-8') as f:
             f.write(admin_content)
     
-    return FileResponse(admin_path, media_type='text/html')
+    return page_response(admin_path, media_type='text/html')
 
 @app.get('/login')
 async def login_page():
     """Serve login page for unauthenticated users"""
-    login_path = os.path.join('static', 'login.html')
+    login_path = page_file('login.html')
     if not os.path.exists(login_path):
         raise HTTPException(status_code=404, detail='Login file not found')
-    return FileResponse(login_path, media_type='text/html')
+    return page_response(login_path, media_type='text/html')
 
 @app.get('/register')
 async def register_page():
     """Serve registration page for new account creation"""
-    register_path = os.path.join('static', 'register.html')
+    register_path = page_file('register.html')
     if not os.path.exists(register_path):
         raise HTTPException(status_code=404, detail='Register file not found')
-    return FileResponse(register_path, media_type='text/html')
+    return page_response(register_path, media_type='text/html')
 
 @app.get('/dean')
 async def dean_dashboard():
     """Dean dashboard for viewing and approving proposed schedules"""
-    dean_path = os.path.join('static', 'dean.html')
+    dean_path = page_file('dean.html')
     if not os.path.exists(dean_path):
         # Create dean dashboard page
         
         with open(dean_path, 'w', encoding='utf-8') as f:
             f.write(dean_content)
     
-    return FileResponse(dean_path, media_type='text/html')
+    return page_response(dean_path, media_type='text/html')
 
 @app.get('/secretary')
 async def secretary_dashboard():
     """Secretary dashboard for viewing, editing, and deleting schedules"""
-    secretary_path = os.path.join('static', 'secretary.html')
+    secretary_path = page_file('secretary.html')
     if not os.path.exists(secretary_path):
         # Create secretary dashboard page
         
@@ -523,19 +727,19 @@ async def secretary_dashboard():
         with open(secretary_path, 'w', encoding='utf-8') as f:
             f.write(secretary_content)
     
-    return FileResponse(secretary_path, media_type='text/html')
+    return page_response(secretary_path, media_type='text/html')
 
 @app.get('/saved-schedules')
 async def saved_schedules_page():
     """Saved schedules management page for chair users"""
-    saved_schedules_path = os.path.join('static', 'saved-schedules.html')
+    saved_schedules_path = page_file('saved-schedules.html')
     if not os.path.exists(saved_schedules_path):
         raise HTTPException(status_code=404, detail='Saved schedules page not found')
-    return FileResponse(saved_schedules_path, media_type='text/html')
+    return page_response(saved_schedules_path, media_type='text/html')
 
 
 @app.post('/schedule')
-async def schedule(payload: dict, username: str = Depends(require_chair_role)):
+async def schedule(payload: dict, request: Request, username: str = Depends(require_chair_role)):
     logger.info('Received request for /schedule')
     
     # Get program selection (default to CS for backward compatibility)
@@ -626,7 +830,7 @@ async def schedule(payload: dict, username: str = Depends(require_chair_role)):
 
     if not has_valid_sections:
         logger.warning('Scheduler: No applicable year levels for the selected semester based on requested sections. Returning empty schedule.')
-        return JSONResponse(content=[])
+        return schedule_response(request, [])
 
     try:
         result = generate_schedule(
@@ -636,7 +840,8 @@ async def schedule(payload: dict, username: str = Depends(require_chair_role)):
             semester_filter,
             filtered_program_sections,
             programs,
-            allow_fallback=allow_fallback
+            allow_fallback=allow_fallback,
+            qualifications=load_teacher_qualifications_from_db()
         )
     except Exception as e:
         logger.error(f"Error in schedule generation: {e}", exc_info=True)
@@ -661,7 +866,7 @@ async def schedule(payload: dict, username: str = Depends(require_chair_role)):
             created = create_schedule_approval(uid, name, semester_int or 0, username)
             if not created:
                 logger.warning('Failed to create schedule approval record')
-            return JSONResponse(content={
+            return schedule_response(request, {
                 'id': uid,
                 'name': name,
                 'status': 'pending',
@@ -671,9 +876,9 @@ async def schedule(payload: dict, username: str = Depends(require_chair_role)):
         except Exception as e:
             # Fall back to returning just the result
             logger.warning(f"Persist schedule failed: {e}")
-            return JSONResponse(content=result)
+            return schedule_response(request, result)
 
-    return JSONResponse(content=result)
+    return schedule_response(request, result)
 
 def _ensure_saved_dir():
     """Ensure the saved_schedules directory exists and is accessible"""
@@ -738,7 +943,7 @@ def _list_saved_summaries():
     items.sort(key=lambda x: x.get('created_at') or '', reverse=True)
     return items
 @app.post('/schedules/generate')
-async def generate_and_submit_schedule(payload: dict, username: str = Depends(require_chair_role)):
+async def generate_and_submit_schedule(payload: dict, request: Request, username: str = Depends(require_chair_role)):
     """Chair generates and submits schedule for approval (status=pending)."""
     # Prefer client-provided schedule when available; fall back to server generation
     client_schedule = payload.get('schedule')
@@ -782,7 +987,8 @@ async def generate_and_submit_schedule(payload: dict, username: str = Depends(re
         semester_filter,
         program_sections,
         programs,
-        allow_fallback=allow_fallback
+        allow_fallback=allow_fallback,
+        qualifications=load_teacher_qualifications_from_db()
     )
     name = (payload.get('name') or 'Generated Schedule')
     semester_int = int(semester_filter) if semester_filter else None
@@ -799,13 +1005,13 @@ async def generate_and_submit_schedule(payload: dict, username: str = Depends(re
 
     # Create approval record
     create_schedule_approval(uid, name, semester_int or 0, username)
-    return JSONResponse(content={'id': uid, 'name': name, 'status': 'pending', 'semester': semester_int, 'schedule': result})
+    return schedule_response(request, {'id': uid, 'name': name, 'status': 'pending', 'semester': semester_int, 'schedule': result})
 
 @app.get('/schedules/pending')
 async def list_pending_schedules(username: str = Depends(require_role(['dean']))):
     """Dean views all pending schedules (grouping is done client-side)."""
     items = get_pending_schedules()
-    return JSONResponse(content=items)
+    return FastJSONResponse(content=items)
 
 
 @app.post('/schedules/{schedule_id}/approve')
@@ -835,93 +1041,19 @@ async def reject_schedule_endpoint_alias(schedule_id: str, payload: dict, userna
 
 
 @app.get('/saved_schedules')
-async def saved_schedules(username: str = Depends(require_chair_role)):
-    """Get all saved schedules with approval status for chair users"""
+async def saved_schedules(status: str | None = None, before: str | None = None, limit: int = 100, username: str = Depends(require_chair_role)):
+    """Get saved schedules with approval status for chair users (keyset paginated via X-Next-Cursor)"""
     try:
-        from database import list_saved_schedules_from_db, get_schedule_approval_status, get_pending_schedules, get_approved_schedules
+        from database import get_saved_schedule_dashboard
         
-        # Get schedules from database first
-        db_schedules = list_saved_schedules_from_db(username)
-        logger.info(f"Retrieved {len(db_schedules)} saved schedules from database for user {username}")
+        limit = max(1, min(limit, 500))
+        page = get_saved_schedule_dashboard(username, status=status, before=before, limit=limit)
+        logger.info(f"Returning {len(page['items'])} saved schedules for user {username}")
         
-        # Get approval records for this user
-        pending_schedules = get_pending_schedules()
-        approved_schedules = get_approved_schedules()
-        
-        # Combine all schedules that belong to this user
-        all_user_schedules = []
-        
-        # Add database schedules
-        for schedule in db_schedules:
-            schedule_id = schedule.get('id')
-            approval_status = get_schedule_approval_status(schedule_id)
-            if approval_status:
-                schedule['status'] = approval_status.get('status', 'pending')
-                schedule['approved_by'] = approval_status.get('approved_by')
-                schedule['rejected_by'] = approval_status.get('rejected_by')
-                schedule['approval_date'] = approval_status.get('approval_date')
-                schedule['rejection_date'] = approval_status.get('rejection_date')
-                schedule['approval_notes'] = approval_status.get('approval_notes')
-                schedule['rejection_notes'] = approval_status.get('rejection_notes')
-            else:
-                schedule['status'] = 'pending'
-            all_user_schedules.append(schedule)
-        
-        # Add pending schedules (from schedule_approvals table)
-        for approval in pending_schedules:
-            if approval.get('created_by') == username:
-                schedule_id = approval.get('schedule_id')
-                logger.info(f"Processing pending schedule: {schedule_id} for user {username}")
-                
-                # Skip if schedule_id is None or empty
-                if not schedule_id:
-                    logger.warning(f"Skipping schedule with empty ID for user {username}")
-                    continue
-                    
-                # Check if we already have this schedule from database
-                if not any(s.get('id') == schedule_id for s in all_user_schedules):
-                    schedule = {
-                        'id': schedule_id,
-                        'name': approval.get('schedule_name', 'Unknown Schedule'),
-                        'semester': approval.get('semester', 0),
-                        'created_at': approval.get('created_at', ''),
-                        'created_by': approval.get('created_by'),
-                        'status': 'pending',
-                        'count': 0  # We don't have the actual schedule data
-                    }
-                    all_user_schedules.append(schedule)
-                    logger.info(f"Added pending schedule: {schedule_id}")
-        
-        # Add approved schedules (from schedule_approvals table)
-        for approval in approved_schedules:
-            if approval.get('created_by') == username:
-                schedule_id = approval.get('schedule_id')
-                logger.info(f"Processing approved schedule: {schedule_id} for user {username}")
-                
-                # Skip if schedule_id is None or empty
-                if not schedule_id:
-                    logger.warning(f"Skipping approved schedule with empty ID for user {username}")
-                    continue
-                    
-                # Check if we already have this schedule from database
-                if not any(s.get('id') == schedule_id for s in all_user_schedules):
-                    schedule = {
-                        'id': schedule_id,
-                        'name': approval.get('schedule_name', 'Unknown Schedule'),
-                        'semester': approval.get('semester', 0),
-                        'created_at': approval.get('created_at', ''),
-                        'created_by': approval.get('created_by'),
-                        'status': 'approved',
-                        'approved_by': approval.get('approved_by'),
-                        'approval_date': approval.get('approval_date'),
-                        'approval_notes': approval.get('approval_notes'),
-                        'count': 0  # We don't have the actual schedule data
-                    }
-                    all_user_schedules.append(schedule)
-                    logger.info(f"Added approved schedule: {schedule_id}")
-        
-        logger.info(f"Returning {len(all_user_schedules)} total schedules for user {username}")
-        return JSONResponse(content=all_user_schedules)
+        headers = {}
+        if page['next_cursor']:
+            headers['X-Next-Cursor'] = page['next_cursor']
+        return FastJSONResponse(content=page['items'], headers=headers)
     except Exception as e:
         logger.error(f"Error retrieving saved schedules: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f'Internal server error: {str(e)}')
@@ -1042,7 +1174,7 @@ async def save_schedule(payload: dict, username: str = Depends(require_chair_rol
         
         # Save to database
         from database import save_schedule_to_db
-        success = save_schedule_to_db(uid, name, semester, username, schedule)
+        success = save_schedule_to_db(uid, name, semester, username, schedule, parent_id=payload.get('parent_id'))
         
         if not success:
             raise HTTPException(status_code=500, detail='Failed to save schedule to database')
@@ -1063,12 +1195,44 @@ async def save_schedule(payload: dict, username: str = Depends(require_chair_rol
         logger.error(f"Error saving schedule: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f'Internal server error: {str(e)}')
 
+def cache_validators(request: Request, etag: Optional[str], last_modified: Optional[float] = None):
+    """Response headers for the validators, and whether the client's cached copy is still fresh.
+
+    Fresh requests get 304 headers carrying the ETag of the coding FastJSONResponse would
+    send, so a revalidated gzip/brotli copy keeps a matching validator.
+    """
+    if not etag:
+        return {}, False
+    from http_cache import is_fresh, not_modified_headers, validator_headers
+    if is_fresh(request.headers, etag, last_modified):
+        from fast_json import choose_encoding
+        encoding = choose_encoding(request.headers.get('accept-encoding'))
+        return not_modified_headers(etag, last_modified, encoding), True
+    return validator_headers(etag, last_modified), False
+
+def saved_schedule_validators(request: Request, schedule_id: str):
+    """cache_validators() of a saved schedule, derived from its content hash (no blob read)"""
+    from database import get_saved_schedule_validator
+    from http_cache import make_etag
+    validator = get_saved_schedule_validator(schedule_id)
+    if not validator or not validator.get('content_hash'):
+        return {}, False
+    parts = [schedule_id, validator['content_hash'], validator['schedule_name'], validator['semester']]
+    if compact_requested(request):
+        parts.append('compact')
+    etag = make_etag(*parts)
+    return cache_validators(request, etag, validator['created_at'])
+
 @app.get('/load_schedule')
-async def load_schedule(id: str, username: str = Depends(require_chair_role)):
+async def load_schedule(id: str, request: Request, username: str = Depends(require_chair_role)):
     """Load a saved schedule by ID from database"""
     try:
         logger.info(f"Loading schedule with ID: {id} for user: {username}")
         
+        cache_headers, fresh = saved_schedule_validators(request, id)
+        if fresh:
+            return Response(status_code=304, headers=cache_headers)
+        
         from database import load_schedule_from_db
         schedule_data = load_schedule_from_db(id)
         
@@ -1077,7 +1241,7 @@ async def load_schedule(id: str, username: str = Depends(require_chair_role)):
             raise HTTPException(status_code=404, detail=f'Saved schedule with ID {id} not found')
         
         logger.info(f"Successfully loaded schedule {id} with {len(schedule_data.get('schedule', []))} entries")
-        return JSONResponse(content=schedule_data)
+        return schedule_response(request, schedule_data, cache_headers)
             
     except HTTPException:
         # Re-raise HTTP exceptions as-is
@@ -1088,7 +1252,7 @@ async def load_schedule(id: str, username: str = Depends(require_chair_role)):
 
 # Dean view: fetch schedule details by id
 @app.get('/api/schedule/{schedule_id}')
-async def get_schedule_for_dean(schedule_id: str, username: str = Depends(require_dean_or_secretary_role)):
+async def get_schedule_for_dean(schedule_id: str, request: Request, username: str = Depends(require_dean_or_secretary_role)):
     """Allow Dean and Secretary to view a saved schedule by id. Only if the schedule approval record still exists."""
     try:
         # First check if the schedule approval record still exists
@@ -1096,6 +1260,10 @@ async def get_schedule_for_dean(schedule_id: str, username: str = Depends(requir
         if not approval_status:
             raise HTTPException(status_code=404, detail='Schedule not found or has been deleted')
         
+        cache_headers, fresh = saved_schedule_validators(request, schedule_id)
+        if fresh:
+            return Response(status_code=304, headers=cache_headers)
+        
         # Load schedule from database
         from database import load_schedule_from_db
         schedule_data = load_schedule_from_db(schedule_id)
@@ -1103,7 +1271,7 @@ async def get_schedule_for_dean(schedule_id: str, username: str = Depends(requir
         if not schedule_data:
             raise HTTPException(status_code=404, detail='Schedule data not found')
         
-        return JSONResponse(content=schedule_data)
+        return schedule_response(request, schedule_data, cache_headers)
         
     except HTTPException:
         raise
@@ -1111,6 +1279,60 @@ async def get_schedule_for_dean(schedule_id: str, username: str = Depends(requir
         logger.error(f"Error loading schedule {schedule_id} for dean/secretary: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f'Internal server error: {str(e)}')
 
+@app.get('/api/schedule/{schedule_id}/diff')
+async def diff_schedule_endpoint(schedule_id: str, against: str | None = None,
+                                 username: str = Depends(require_role(['dean', 'secretary', 'chair']))):
+    """Added, removed and moved meetings of a schedule relative to `against` (default: its previous version)"""
+    try:
+        from database import load_schedule_from_db
+        from schedule_versions import diff_schedules
+        current = load_schedule_from_db(schedule_id)
+        if not current:
+            raise HTTPException(status_code=404, detail='Schedule not found')
+        against = against or current.get('parent_id')
+        if not against:
+            raise HTTPException(status_code=404, detail='Schedule has no previous version to compare against')
+        previous = load_schedule_from_db(against)
+        if not previous:
+            raise HTTPException(status_code=404, detail=f'Schedule {against} not found')
+
+        diff = diff_schedules(previous['schedule'], current['schedule'])
+        return FastJSONResponse(content={'from': against, 'to': schedule_id, **diff})
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error diffing schedule {schedule_id} against {against}: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f'Internal server error: {str(e)}')
+
+@app.get('/api/timetable/{kind}/{key}')
+async def get_timetable_endpoint(kind: str, key: str, semester: int | None = None, day: str | None = None,
+                                 start: str | None = None, end: str | None = None,
+                                 username: str = Depends(verify_token)):
+    """Timetable of one teacher, room or section across approved schedules.
+
+    Optional filters: semester, day ('Mon'..'Sat'), and a time window start/end ('HH:MM').
+    """
+    try:
+        from database import TIMETABLE_KEYS, get_timetable
+        from schedule_utils import day_index, slot_index
+        if kind not in TIMETABLE_KEYS:
+            raise HTTPException(status_code=404, detail=f"Unknown timetable type '{kind}'")
+
+        day_idx = day_index(day) if day else None
+        start_slot = slot_index(start) if start else None
+        # The window end is exclusive: round it up so a meeting overlapping it is kept
+        end_slot = slot_index(end, round_up=True) if end else None
+        if (day and day_idx is None) or (start and start_slot is None) or (end and end_slot is None):
+            raise HTTPException(status_code=400, detail='Invalid day or time filter')
+
+        entries = get_timetable(kind, key, semester=semester, day=day_idx, start_slot=start_slot, end_slot=end_slot)
+        return FastJSONResponse(content={'kind': kind, 'key': key, 'semester': semester, 'entries': entries})
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error loading {kind} timetable for {key}: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get('/download_schedule')
 async def download_schedule(id: str | None = None, semester: str | None = None, username: str = Depends(require_role(['chair', 'dean']))):
     """Download a schedule as CSV"""
@@ -1125,12 +1347,14 @@ async def download_schedule(id: str | None = None, semester: str | None = None,
             schedule_data = schedule.get('schedule') or []
         elif semester:
             # Pick most recent for semester
-            from database import list_saved_schedules_from_db
-            summaries = list_saved_schedules_from_db()
-            semester_schedules = [s for s in summaries if str(s.get('semester')) == str(semester)]
-            if semester_schedules:
-                chosen = semester_schedules[0]
-                return await download_schedule(id=chosen['id'])
+            from database import get_latest_saved_schedule_id
+            try:
+                semester_int = int(semester)
+            except ValueError:
+                raise HTTPException(status_code=400, detail='Semester must be a number')
+            chosen_id = get_latest_saved_schedule_id(semester_int)
+            if chosen_id:
+                return await download_schedule(id=chosen_id)
             else:
                 raise HTTPException(status_code=404, detail='No saved schedule found for that semester')
         else:
@@ -1198,9 +1422,33 @@ async def download_schedule(id: str | None = None, semester: str | None = None,
     headers = {"Content-Disposition": "attachment; filename=schedule.csv"}
     return Response(content=csv_bytes, media_type='text/csv', headers=headers)
 
+# /data/{filename} -> data_versions entry that changes whenever its tables do
+DATA_VERSION_NAMES = {
+    'cs_curriculum': 'curriculum',
+    'subjects': 'curriculum',
+    'it_curriculum': 'curriculum',
+    'all_curriculum': 'curriculum',
+    'teachers': 'teachers',
+    'rooms': 'rooms',
+    'sections': 'sections',
+}
+
 @app.get('/data/{filename}')
-async def get_data(filename: str, username: str = Depends(require_chair_role)):
+async def get_data(filename: str, request: Request, username: str = Depends(require_chair_role)):
     try:
+        if filename not in DATA_VERSION_NAMES:
+            raise HTTPException(status_code=404, detail='Data type not found')
+        from database import get_data_version
+        from http_cache import make_etag
+        version = get_data_version(DATA_VERSION_NAMES[filename])
+        cache_headers, fresh = cache_validators(
+            request,
+            make_etag(filename, version['version']) if version else None,
+            version['updated_at'] if version else None
+        )
+        if fresh:
+            return Response(status_code=304, headers=cache_headers)
+
         if filename in ['cs_curriculum', 'subjects']:
             data = load_subjects_from_db(['CS'])
         elif filename == 'it_curriculum':
@@ -1213,9 +1461,7 @@ async def get_data(filename: str, username: str = Depends(require_chair_role)):
             data = load_rooms_from_db()
         elif filename == 'sections':
             data = load_sections_from_db()
-        else:
-            raise HTTPException(status_code=404, detail='Data type not found')
-        return JSONResponse(content=data)
+        return FastJSONResponse(content=data, headers=cache_headers)
     except HTTPException:
         # Preserve original status codes (e.g., 401/403/404)
         raise
@@ -1223,110 +1469,49 @@ async def get_data(filename: str, username: str = Depends(require_chair_role)):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post('/upload/{filename}')
-async def upload_file(filename: str, file: UploadFile = File(...), username: str = Depends(require_chair_role)):
-    """Accept CSV uploads and upsert into database for supported datasets."""
-    try:
-        content = await file.read()
-        text = content.decode('utf-8-sig')
-        reader = csv.DictReader(io.StringIO(text))
-        # Normalize keys to lowercase for robust mapping
-        rows = []
-        for raw in reader:
-            rows.append({ (k or '').strip().lower(): (v or '').strip() for k, v in raw.items() })
-        if not rows:
-            raise HTTPException(status_code=400, detail='Empty CSV file')
+async def upload_file(filename: str, request: Request, file: UploadFile = File(...),
+                      username: str = Depends(require_chair_role)):
+    """Accept CSV uploads and bulk upsert them into the database (all-or-nothing)."""
+    try:
+        from starlette.concurrency import run_in_threadpool
+        from csv_ingest import DATASETS, CsvIngestion, UploadTooLarge, iter_csv_batches
+        if filename not in DATASETS:
+            raise HTTPException(status_code=404, detail='Unsupported upload type')
 
-        def safe_int(val):
-            try:
-                v = (val or '').strip()
-                if v == '':
-                    return 0
-                # handle floats like '2.0'
-                if '.' in v:
-                    return int(float(v))
-                return int(v)
-            except Exception:
-                return 0
+        # UploadSizeLimitMiddleware has already bounded the request body (and read the
+        # limit); the parser re-checks the file part itself
+        max_bytes = getattr(request.state, 'upload_limit_bytes', None)
+        if max_bytes is None:
+            max_bytes = await run_in_threadpool(upload_limit_bytes)
 
-        if filename in ['cs_curriculum', 'subjects']:
-            from database import add_subject
-            for r in rows:
-                subject = {
-                    'subject_code': r.get('subject_code') or r.get('code') or '',
-                    'subject_name': r.get('subject_name') or r.get('name') or '',
-                    'lecture_hours_per_week': safe_int(r.get('lecture_hours_per_week') or r.get('lec_hours')),
-                    'lab_hours_per_week': safe_int(r.get('lab_hours_per_week') or r.get('lab_hours')),
-                    'units': safe_int(r.get('units')),
-                    'semester': (lambda x: (safe_int(x) or None))(r.get('semester')),
-                    'program_specialization': (r.get('program_specialization') or r.get('program') or None),
-                    'year_level': (lambda x: (safe_int(x) or None))(r.get('year_level') or r.get('year')),
-                }
-                if not subject['subject_code']:
-                    continue
-                add_subject(subject)
-            return JSONResponse(content={'message': 'CS Curriculum CSV uploaded successfully'})
-        elif filename == 'it_curriculum':
-            from database import add_it_subject
-            for r in rows:
-                subject = {
-                    'subject_code': r.get('subject_code') or r.get('code') or '',
-                    'subject_name': r.get('subject_name') or r.get('name') or '',
-                    'lecture_hours_per_week': safe_int(r.get('lecture_hours_per_week') or r.get('lec_hours')),
-                    'lab_hours_per_week': safe_int(r.get('lab_hours_per_week') or r.get('lab_hours')),
-                    'units': safe_int(r.get('units')),
-                    'semester': (lambda x: (safe_int(x) or None))(r.get('semester')),
-                    'program_specialization': (r.get('program_specialization') or r.get('program') or None),
-                    'year_level': (lambda x: (safe_int(x) or None))(r.get('year_level') or r.get('year')),
-                }
-                if not subject['subject_code']:
-                    continue
-                add_it_subject(subject)
-            return JSONResponse(content={'message': 'IT Curriculum CSV uploaded successfully'})
-        elif filename == 'teachers':
-            from database import add_teacher
-            added_count = 0
-            for r in rows:
-                teacher = {
-                    'teacher_name': r.get('teacher_name') or r.get('name') or '',
-                    'can_teach': r.get('can_teach') or r.get('subjects') or '',
-                }
-                if not teacher['teacher_name']:
-                    continue
-                teacher_id = add_teacher(teacher)
-                added_count += 1
-                logger.info(f"Added teacher '{teacher['teacher_name']}' with ID: {teacher_id}")
-            return JSONResponse(content={'message': f'Teachers CSV uploaded successfully. Added {added_count} teachers.'})
-        elif filename == 'rooms':
-            from database import add_room
-            added_count = 0
-            for r in rows:
-                val = (str(r.get('is_laboratory') or r.get('lab') or '').strip().lower())
-                is_lab = val in ['1', 'true', 'yes', 'y']
-                room = {
-                    'room_name': (r.get('room_name') or r.get('name') or ''),
-                    'is_laboratory': is_lab,
-                }
-                if not room['room_name']:
-                    continue
-                room_id = add_room(room)
-                added_count += 1
-                logger.info(f"Added room '{room['room_name']}' with ID: {room_id}")
-            return JSONResponse(content={'message': f'Rooms CSV uploaded successfully. Added {added_count} rooms.'})
-        elif filename == 'sections':
-            from database import add_section
-            for r in rows:
-                section = {
-                    'section_id': r.get('section_id') or r.get('id') or '',
-                    'subject_code': (r.get('subject_code') or '') or None,
-                    'year_level': (lambda x: (safe_int(x) or None))(r.get('year_level') or r.get('year')),
-                    'num_meetings_non_lab': safe_int(r.get('num_meetings_non_lab') or r.get('meetings')),
-                }
-                if not section['section_id']:
-                    continue
-                add_section(section)
-            return JSONResponse(content={'message': 'Sections CSV uploaded successfully'})
-        else:
-            raise HTTPException(status_code=404, detail='Unsupported upload type')
+        # Stream the file through the parser so memory stays flat regardless of size; the
+        # COPY work runs in the threadpool so the event loop keeps serving other requests
+        ingestion = CsvIngestion(db.db, filename)
+        await run_in_threadpool(ingestion.__enter__)
+        try:
+            async for batch in iter_csv_batches(file, max_bytes):
+                await run_in_threadpool(ingestion.feed, batch)
+            report = await run_in_threadpool(ingestion.finish)
+        except UploadTooLarge as e:
+            raise HTTPException(status_code=413, detail=str(e))
+        except UnicodeDecodeError:
+            raise HTTPException(status_code=400, detail='CSV file must be UTF-8 encoded')
+        finally:
+            await run_in_threadpool(ingestion.__exit__, None, None, None)
+
+        if report['rows'] == 0:
+            raise HTTPException(status_code=400, detail='Empty CSV file')
+        if report['error_count']:
+            first = report['errors'][0]
+            return JSONResponse(status_code=400, content={
+                'error': f"{report['error_count']} invalid row(s); nothing was imported (line {first['line']}: {first['error']})",
+                **report
+            })
+
+        return JSONResponse(content={
+            'message': f"{report['dataset']} CSV uploaded successfully. Imported {report['loaded']} rows.",
+            **report
+        })
     except HTTPException:
         raise
     except Exception as e:
@@ -1396,6 +1581,14 @@ async def delete_it_subject_endpoint(subject_code: str, username: str = Depends(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get('/api/subjects/{subject_code}/teachers')
+async def get_qualified_teachers_endpoint(subject_code: str, username: str = Depends(require_role(['chair', 'dean', 'secretary']))):
+    """List the teachers qualified to teach a subject"""
+    try:
+        return JSONResponse(content=db.get_qualified_teachers(subject_code))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post('/api/teachers')
 async def add_teacher_endpoint(teacher_data: dict, username: str = Depends(require_chair_role)):
     """Add a new teacher to the database"""
@@ -1404,6 +1597,8 @@ async def add_teacher_endpoint(teacher_data: dict, username: str = Depends(requi
         teacher_id = add_teacher(teacher_data)
         logger.info(f"Teacher added successfully with ID: {teacher_id}")
         return JSONResponse(content={'message': 'Teacher added successfully', 'teacher_id': teacher_id})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error adding teacher: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -1416,6 +1611,8 @@ async def update_teacher_endpoint(teacher_id: str, teacher_data: dict, username:
         logger.info(f"Updating teacher {teacher_id} with data: {teacher_data}")
         update_teacher(teacher_id, teacher_data)
         return JSONResponse(content={'message': 'Teacher updated successfully'})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error updating teacher {teacher_id}: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -1532,7 +1729,7 @@ async def get_pending_schedules_endpoint(username: str = Depends(require_dean_ro
         logger.info(f"Dean requesting pending schedules. Found {len(schedules)} schedules")
         for schedule in schedules:
             logger.debug(f"  - Schedule ID: {schedule.get('schedule_id')}, Status: {schedule.get('status')}")
-        return JSONResponse(content=schedules)
+        return FastJSONResponse(content=schedules)
     except Exception as e:
         logger.error(f"Error getting pending schedules: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -1543,7 +1740,7 @@ async def get_approved_schedules_endpoint(username: str = Depends(require_role([
     try:
         from database import get_approved_schedules
         schedules = get_approved_schedules()
-        return JSONResponse(content=schedules)
+        return FastJSONResponse(content=schedules)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -1617,7 +1814,7 @@ async def get_notifications_endpoint(username: str = Depends(verify_token)):
         notifications = get_user_notifications(user_id)
         logger.info(f"Found {len(notifications)} notifications for user_id: {user_id}")
         
-        return JSONResponse(content=notifications)
+        return FastJSONResponse(content=notifications)
     except HTTPException:
         # Re-raise HTTP exceptions as-is
         raise
@@ -1641,7 +1838,7 @@ async def get_unread_notifications_endpoint(username: str = Depends(verify_token
         notifications = get_user_notifications(user_id, unread_only=True)
         logger.info(f"Found {len(notifications)} unread notifications for user_id: {user_id}")
         
-        return JSONResponse(content=notifications)
+        return FastJSONResponse(content=notifications)
     except HTTPException:
         # Re-raise HTTP exceptions as-is
         raise
@@ -0,0 +1,164 @@
+"""
+Teacher availability encoded as a day x time-window bitmask
+
+Bit (day_idx * WINDOW_COUNT + window) is set when the teacher is available in
+that window of that day. Days follow DAY_LABELS (0 = Mon) and windows split the
+07:00-18:00 slot grid at noon. The same integer is stored in
+teachers.availability_mask and consumed directly by the solver.
+
+Finer time-of-day availability is stored as explicit windows
+(teacher_availability_windows): (day, start_slot, end_slot) tuples that replace
+the AM/PM bits for the days they cover. The solver turns the gaps between a
+day's windows into fixed blocked intervals (see blocked_ranges).
+"""
+
+import re
+from typing import Any, Dict, List, Tuple
+
+from schedule_utils import DAY_LABELS, day_index, slot_index, slot_label
+
+# (label, first slot, end slot) on the 30-minute grid starting at 07:00
+WINDOWS = [
+    ('AM', 0, 10),   # 07:00-12:00
+    ('PM', 10, 22),  # 12:00-18:00
+]
+WINDOW_COUNT = len(WINDOWS)
+DAY_BITS = (1 << WINDOW_COUNT) - 1
+FULL_MASK = (1 << (len(DAY_LABELS) * WINDOW_COUNT)) - 1
+
+SLOTS_PER_DAY = WINDOWS[-1][2]
+
+Window = Tuple[int, int, int]  # (day_idx, start_slot, end_slot), end exclusive
+
+
+def day_mask(day_idx: int) -> int:
+    """All window bits of one day"""
+    return DAY_BITS << (day_idx * WINDOW_COUNT)
+
+
+def mask_from_days(days: Any) -> int:
+    """Build a mask from day labels (list, 'Mon,Tue' or '{Mon,Tue}'); empty means always available"""
+    if isinstance(days, str):
+        days = days.strip('{}').replace('"', '').split(',')
+    mask = 0
+    for day in days or []:
+        label = str(day).strip()[:3].title()
+        if label in DAY_LABELS:
+            mask |= day_mask(DAY_LABELS.index(label))
+    return mask or FULL_MASK
+
+
+def days_from_mask(mask: int) -> List[str]:
+    """Day labels with at least one available window"""
+    return [label for i, label in enumerate(DAY_LABELS) if mask & day_mask(i)]
+
+
+def teacher_mask(teacher: Dict[str, Any]) -> int:
+    """Availability mask of a teacher row (falls back to availability_days for older rows)"""
+    mask = teacher.get('availability_mask')
+    if mask is None:
+        return mask_from_days(teacher.get('availability_days'))
+    return int(mask) & FULL_MASK or FULL_MASK
+
+
+def is_available(mask: int, day_idx: int) -> bool:
+    """True when any window of the day is available"""
+    return bool(mask & day_mask(day_idx))
+
+
+def is_full_day(mask: int, day_idx: int) -> bool:
+    """True when every window of the day is available"""
+    bits = day_mask(day_idx)
+    return mask & bits == bits
+
+
+def _slot_boundary(time_text: str) -> int:
+    """Map a clock time ('12:00') to the slot boundary it falls on"""
+    slot = slot_index(time_text)
+    if slot is None or slot > SLOTS_PER_DAY:
+        raise ValueError(f"Invalid time '{time_text}'")
+    return slot
+
+
+def format_window(window: Window) -> str:
+    """(0, 0, 10) -> 'Mon 07:00-12:00'"""
+    day, start, end = window
+    return f"{DAY_LABELS[day]} {slot_label(start)[:5]}-{slot_label(end)[:5]}"
+
+
+def parse_windows(value: Any) -> List[Window]:
+    """Parse windows given as 'Mon 07:00-12:00, Tue 13:00-17:00', a list of such strings,
+    (day, start_slot, end_slot) triples or {'day', 'start', 'end'} dicts.
+
+    Raises ValueError for malformed windows or ones that end before they start.
+    """
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = [part for part in re.split(r'[,;\n]', value) if part.strip()]
+    windows = []
+    for item in value:
+        if isinstance(item, str):
+            match = re.fullmatch(r'\s*([A-Za-z]+)\s+(\d{1,2}:\d{2})\s*-\s*(\d{1,2}:\d{2})\s*', item)
+            if not match:
+                raise ValueError(f"Invalid availability window '{item}' (expected e.g. 'Mon 07:00-12:00')")
+            day, start, end = day_index(match.group(1)), _slot_boundary(match.group(2)), _slot_boundary(match.group(3))
+        elif isinstance(item, dict):
+            day = day_index(item.get('day')) if isinstance(item.get('day'), str) else item.get('day')
+            start, end = (_slot_boundary(item.get(k)) if isinstance(item.get(k), str) else item.get(k)
+                          for k in ('start', 'end'))
+        else:
+            day, start, end = item
+        if day is None or not 0 <= int(day) < len(DAY_LABELS) or not 0 <= int(start) < int(end) <= SLOTS_PER_DAY:
+            raise ValueError(f"Invalid availability window {item!r}")
+        windows.append((int(day), int(start), int(end)))
+    return sorted(set(windows))
+
+
+def mask_with_windows(mask: int, windows: List[Window]) -> int:
+    """Recompute the AM/PM bits of days that have explicit windows"""
+    for day in {w[0] for w in windows}:
+        mask &= ~day_mask(day)
+        for bit, (_, win_start, win_end) in enumerate(WINDOWS):
+            if any(start < win_end and end > win_start for d, start, end in windows if d == day):
+                mask |= 1 << (day * WINDOW_COUNT + bit)
+    return mask
+
+
+def free_ranges(mask: int, windows: List[Window], day_idx: int) -> List[Tuple[int, int]]:
+    """Merged (start_slot, end_slot) ranges in which the teacher is available on a day.
+
+    The mask decides which days are available at all; explicit windows, when a
+    day has any, replace its AM/PM bits for the time of day.
+    """
+    if not is_available(mask, day_idx):
+        return []
+    ranges = sorted((start, end) for d, start, end in windows if d == day_idx)
+    if not ranges:
+        ranges = [(start, end) for bit, (_, start, end) in enumerate(WINDOWS)
+                  if mask & (1 << (day_idx * WINDOW_COUNT + bit))]
+    merged: List[Tuple[int, int]] = []
+    for start, end in ranges:
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def blocked_ranges(mask: int, windows: List[Window], day_idx: int) -> List[Tuple[int, int]]:
+    """Gaps of a partially available day, as (start_slot, end_slot) ranges.
+
+    Returns [] for days that are fully available and for days that are not
+    available at all (those are excluded from the teacher's days instead).
+    """
+    free = free_ranges(mask, windows, day_idx)
+    blocked = []
+    cursor = 0
+    for start, end in free:
+        if start > cursor:
+            blocked.append((cursor, start))
+        cursor = end
+    if free and cursor < SLOTS_PER_DAY:
+        blocked.append((cursor, SLOTS_PER_DAY))
+    return blocked if free else []
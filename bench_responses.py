@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Response benchmark: serialization time and bytes on the wire for schedule payloads
+
+Builds a synthetic multi-program schedule shaped like generate_schedule() output
+and compares the previous path (stdlib json, uncompressed) with fast_json
+(orjson when installed, plus gzip/brotli) and the columnar compact format
+(?format=compact). "parse" is json.loads of the body, a stand-in for the
+browser's JSON.parse; decoding compact columns back into rows is reported
+separately:
+
+    python bench_responses.py --entries 1500 --runs 20
+"""
+
+import argparse
+import json
+import statistics
+import time
+
+import fast_json
+from schedule_codec import compact_payload, decode_entries
+from schedule_utils import DAY_LABELS, slot_label
+
+TYPES = ['lecture', 'lab', 'non_lab']
+
+
+def sample_schedule(entries: int) -> dict:
+    schedule = []
+    for i in range(entries):
+        program = 'CS' if i % 2 else 'IT'
+        schedule.append({
+            'section_id': f"{program}{1 + i % 4}{chr(65 + i % 5)}",
+            'subject_code': f"{program}{100 + i % 60}",
+            'subject_name': f"Introduction to {program} Systems Analysis and Design Part {i % 60}",
+            'type': TYPES[i % 3],
+            'teacher_name': f"Prof. Teacher Number {i % 45}",
+            'room_id': f"Room {200 + i % 30}",
+            'day': DAY_LABELS[i % 6],
+            'start_time_slot': slot_label(i % 20),
+            'duration_slots': 2 + i % 3,
+        })
+    return {'id': '20240101120000', 'name': 'Benchmark schedule', 'semester': 1, 'schedule': schedule}
+
+
+def stdlib_dumps(content) -> bytes:
+    """What JSONResponse.render does"""
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(',', ':')).encode('utf-8')
+
+
+def timed(fn, runs: int):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return result, statistics.median(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entries', type=int, default=1500)
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+    payload = sample_schedule(args.entries)
+
+    print(f"📦 Response benchmark ({args.entries} entries, median of {args.runs} runs)")
+    print(f"   encoder: {'orjson' if fast_json.orjson else 'stdlib json (pip install orjson)'}, "
+          f"brotli: {'yes' if fast_json.brotli else 'no (pip install brotli)'}")
+
+    before, before_ms = timed(lambda: stdlib_dumps(payload), args.runs)
+    _, parse_ms = timed(lambda: json.loads(before), args.runs)
+    rows = [('before: stdlib json', before, before_ms, parse_ms)]
+
+    for label, build in (('fast_json', lambda: payload), ('compact', lambda: compact_payload(payload))):
+        body, dumps_ms = timed(lambda: fast_json.dumps(build()), args.runs)
+        _, parse_ms = timed(lambda: json.loads(body), args.runs)
+        rows.append((label, body, dumps_ms, parse_ms))
+        gz, gz_ms = timed(lambda: fast_json.compress(body, 'gzip'), args.runs)
+        rows.append(('  + gzip', gz, dumps_ms + gz_ms, None))
+        if fast_json.brotli:
+            br, br_ms = timed(lambda: fast_json.compress(body, 'br'), args.runs)
+            rows.append(('  + brotli', br, dumps_ms + br_ms, None))
+
+    compact_schedule = compact_payload(payload)['schedule']
+    _, decode_ms = timed(lambda: decode_entries(compact_schedule), args.runs)
+
+    for label, data, ms, parse_ms in rows:
+        parse = f"   parse {parse_ms:8.2f} ms" if parse_ms is not None else ''
+        print(f"{label:<22} {len(data):>10,} bytes ({len(data) / len(before):6.1%})   encode {ms:8.2f} ms{parse}")
+    print(f"compact rows decode    {decode_ms:8.2f} ms (schedule_codec.decode_entries)")
+
+
+if __name__ == "__main__":
+    main()
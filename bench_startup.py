@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark: how long a fresh interpreter takes to import the app
+
+Each run imports the module in a new process (as a uvicorn worker does) and
+reports the median and best wall time. Pass --compare <git-ref> to measure an
+older revision side by side, e.g. the commit before lazy initialization:
+
+    python bench_startup.py --runs 10 --compare HEAD~1
+
+Modules that cannot be imported here (e.g. app without fastapi installed) are
+reported as skipped, with the error, instead of aborting the run.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+SNIPPET = "import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+
+
+class ImportFailed(Exception):
+    pass
+
+
+def time_import(module: str, cwd: str, runs: int) -> list:
+    """Import times (seconds) of module in `runs` fresh interpreters; ImportFailed if it cannot be imported"""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+    times = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, '-c', SNIPPET.format(module=module)],
+            cwd=cwd, env=env, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            lines = result.stderr.strip().splitlines()
+            raise ImportFailed(lines[-1] if lines else f"exit status {result.returncode}")
+        times.append(float(result.stdout.strip().splitlines()[-1]))
+    return times
+
+
+def report(label: str, times: list):
+    print(f"{label:<28} median {statistics.median(times) * 1000:8.1f} ms   best {min(times) * 1000:8.1f} ms")
+
+
+def measure(label: str, module: str, cwd: str, runs: int) -> bool:
+    """Time and report one module; a failed import is reported as skipped"""
+    try:
+        times = time_import(module, cwd, runs)
+    except ImportFailed as e:
+        print(f"{label:<28} skipped ({e})")
+        return False
+    report(label, times)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--module', action='append', help="Module to import (default: app and scheduler)")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--compare', metavar='GIT_REF', help="Also measure this revision")
+    args = parser.parse_args()
+    modules = args.module or ['app', 'scheduler']
+    here = os.path.dirname(os.path.abspath(__file__))
+
+    print(f"🚀 Startup benchmark ({args.runs} runs per module)")
+    measured = 0
+    for module in modules:
+        measured += measure(f"{module} (working tree)", module, here, args.runs)
+
+    if args.compare:
+        with tempfile.TemporaryDirectory() as tmp:
+            worktree = os.path.join(tmp, 'baseline')
+            subprocess.run(['git', 'worktree', 'add', '--detach', worktree, args.compare],
+                           cwd=here, check=True, capture_output=True)
+            try:
+                for module in modules:
+                    measured += measure(f"{module} ({args.compare})", module, worktree, args.runs)
+            finally:
+                subprocess.run(['git', 'worktree', 'remove', '--force', worktree], cwd=here, capture_output=True)
+
+    if not measured:
+        print("❌ No module could be imported")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Static asset build: fingerprint, precompress and rewrite references
+
+Copies every asset under static/ to static/dist/ with a content hash in its
+name (style.css -> style.3f2a1b4c5d.css), writes .gz (and .br when the brotli
+package is installed) siblings for text assets, and rewrites /static/...
+references inside CSS and the HTML pages. Rewritten pages land in
+static/dist/pages/ and are what the app serves when present. Fingerprinted
+files never change, so they are served with immutable long-lived cache headers.
+
+    python build_assets.py        # run on deploy, before starting the app
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+
+try:
+    import brotli
+except ImportError:  # optional: gzip-only builds
+    brotli = None
+
+STATIC_DIR = 'static'
+DIST_NAME = 'dist'
+PAGES_NAME = 'pages'
+MANIFEST_NAME = 'manifest.json'
+URL_PREFIX = '/static/'
+
+HASH_LENGTH = 10
+COMPRESSIBLE = {'.css', '.js', '.html', '.svg', '.json', '.txt', '.map'}
+MIN_COMPRESS_BYTES = 256
+# Sources that are not served to browsers
+SKIP_FILES = {'robots.txt'}
+SKIP_PATTERN = re.compile(r'_(backup|clean)\.js$')
+
+# /static/<path> optionally followed by a ?query cache-buster
+REFERENCE = re.compile(r'/static/([A-Za-z0-9_./-]+)(\?[A-Za-z0-9_=&.-]*)?')
+
+
+def fingerprint(rel_path: str, content: bytes) -> str:
+    """'assets/lpu.png' -> 'assets/lpu.<hash>.png'"""
+    stem, ext = os.path.splitext(rel_path)
+    return f"{stem}.{hashlib.sha256(content).hexdigest()[:HASH_LENGTH]}{ext}"
+
+
+def rewrite_references(text: str, manifest: dict) -> str:
+    """Point /static/... references at their fingerprinted copies (dropping ?v= busters)"""
+    def replace(match):
+        url = URL_PREFIX + match.group(1)
+        return manifest.get(url, match.group(0))
+    return REFERENCE.sub(replace, text)
+
+
+def write_compressed(path: str, content: bytes):
+    """Write precompressed siblings of an output file"""
+    if os.path.splitext(path)[1] not in COMPRESSIBLE or len(content) < MIN_COMPRESS_BYTES:
+        return
+    with open(path + '.gz', 'wb') as f:
+        f.write(gzip.compress(content, compresslevel=9, mtime=0))
+    if brotli is not None:
+        with open(path + '.br', 'wb') as f:
+            f.write(brotli.compress(content, quality=11))
+
+
+def _write(path: str, content: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(content)
+    write_compressed(path, content)
+
+
+def source_files(static_dir: str):
+    """Relative paths of the assets and of the HTML pages under static_dir"""
+    assets, pages = [], []
+    for root, dirs, files in os.walk(static_dir):
+        dirs[:] = [d for d in dirs if not (root == static_dir and d == DIST_NAME)]
+        for name in files:
+            rel = os.path.relpath(os.path.join(root, name), static_dir).replace(os.sep, '/')
+            if name.endswith('.html') and '/' not in rel:
+                pages.append(rel)
+            elif name not in SKIP_FILES and not SKIP_PATTERN.search(name):
+                assets.append(rel)
+    # CSS last, so the images it references are fingerprinted first
+    assets.sort(key=lambda rel: (rel.endswith('.css'), rel))
+    return assets, sorted(pages)
+
+
+def build(static_dir: str = STATIC_DIR) -> dict:
+    """Build static_dir/dist and return the manifest (source URL -> fingerprinted URL)"""
+    dist_dir = os.path.join(static_dir, DIST_NAME)
+    shutil.rmtree(dist_dir, ignore_errors=True)
+    assets, pages = source_files(static_dir)
+
+    manifest = {}
+    for rel in assets:
+        with open(os.path.join(static_dir, rel), 'rb') as f:
+            content = f.read()
+        if rel.endswith('.css'):
+            content = rewrite_references(content.decode('utf-8'), manifest).encode('utf-8')
+        hashed = fingerprint(rel, content)
+        _write(os.path.join(dist_dir, hashed), content)
+        manifest[URL_PREFIX + rel] = f"{URL_PREFIX}{DIST_NAME}/{hashed}"
+
+    for rel in pages:
+        with open(os.path.join(static_dir, rel), encoding='utf-8') as f:
+            html = rewrite_references(f.read(), manifest)
+        _write(os.path.join(dist_dir, PAGES_NAME, rel), html.encode('utf-8'))
+
+    with open(os.path.join(dist_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def main():
+    static_dir = sys.argv[1] if len(sys.argv) > 1 else STATIC_DIR
+    manifest = build(static_dir)
+    print(f"✅ Built {len(manifest)} fingerprinted assets into {os.path.join(static_dir, DIST_NAME)}"
+          f" ({'gzip + brotli' if brotli else 'gzip only; pip install brotli for .br'})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,400 @@
+"""
+Bulk CSV ingestion for curriculum, teachers, rooms and sections
+
+Rows are validated in a single streaming pass, valid rows are loaded into a
+temporary staging table with COPY, and the staging table is merged into the
+target table with one INSERT ... ON CONFLICT. Everything runs on one
+connection inside one transaction, so an upload either lands completely or
+not at all; invalid rows are reported back with their CSV line numbers.
+
+Teachers and rooms may be uploaded without an ID column: such rows are matched
+to existing rows by name (case-insensitively), and new names get an ID derived
+from the name, so re-uploading the same file updates rather than duplicates.
+"""
+
+import codecs
+import csv
+import io
+import logging
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Cap on how many per-row errors are returned to the client (all are counted)
+MAX_REPORTED_ERRORS = 100
+
+# NULL marker used in the COPY stream
+COPY_NULL = '\\N'
+
+# Streaming parser defaults: bytes read per chunk and rows handed over per batch
+UPLOAD_CHUNK_SIZE = 64 * 1024
+UPLOAD_BATCH_SIZE = 1000
+
+
+class RowError(ValueError):
+    """Raised by a row normalizer when a CSV row cannot be ingested"""
+
+
+class UploadTooLarge(ValueError):
+    """Raised when an upload exceeds the configured size limit"""
+
+
+def _parse_int(value: Optional[str], field: str, blank=0) -> Optional[int]:
+    """Parse an integer cell ('2', '2.0'); blank cells map to `blank`"""
+    v = (value or '').strip()
+    if v == '':
+        return blank
+    try:
+        return int(float(v)) if '.' in v else int(v)
+    except ValueError:
+        raise RowError(f"{field} must be a number (got '{v}')")
+
+
+def _first(row: Dict[str, str], *keys: str) -> str:
+    for key in keys:
+        if row.get(key):
+            return row[key]
+    return ''
+
+
+def normalize_curriculum_row(row: Dict[str, str]) -> Dict[str, Any]:
+    subject_code = _first(row, 'subject_code', 'code')
+    if not subject_code:
+        raise RowError("subject_code is required")
+    subject_name = _first(row, 'subject_name', 'name')
+    if not subject_name:
+        raise RowError("subject_name is required")
+    return {
+        'subject_code': subject_code,
+        'subject_name': subject_name,
+        'lecture_hours_per_week': _parse_int(_first(row, 'lecture_hours_per_week', 'lec_hours'), 'lecture_hours_per_week'),
+        'lab_hours_per_week': _parse_int(_first(row, 'lab_hours_per_week', 'lab_hours'), 'lab_hours_per_week'),
+        'units': _parse_int(row.get('units'), 'units'),
+        'semester': _parse_int(row.get('semester'), 'semester', blank=None) or None,
+        'program_specialization': _first(row, 'program_specialization', 'program') or None,
+        'year_level': _parse_int(_first(row, 'year_level', 'year'), 'year_level', blank=None) or None,
+    }
+
+
+def normalize_teacher_row(row: Dict[str, str]) -> Dict[str, Any]:
+    teacher_name = _first(row, 'teacher_name', 'name')
+    if not teacher_name:
+        raise RowError("teacher_name is required")
+    return {
+        'teacher_id': row.get('teacher_id') or None,  # resolved by name in finish()
+        'teacher_name': teacher_name,
+        'can_teach': _first(row, 'can_teach', 'subjects'),
+    }
+
+
+def normalize_room_row(row: Dict[str, str]) -> Dict[str, Any]:
+    room_name = _first(row, 'room_name', 'name')
+    if not room_name:
+        raise RowError("room_name is required")
+    lab_flag = _first(row, 'is_laboratory', 'lab').strip().lower()
+    return {
+        'room_id': row.get('room_id') or None,  # resolved by name in finish()
+        'room_name': room_name,
+        'is_laboratory': lab_flag in ['1', 'true', 'yes', 'y'],
+    }
+
+
+def normalize_section_row(row: Dict[str, str]) -> Dict[str, Any]:
+    section_id = _first(row, 'section_id', 'id')
+    if not section_id:
+        raise RowError("section_id is required")
+    return {
+        'section_id': section_id,
+        'subject_code': row.get('subject_code') or None,
+        'year_level': _parse_int(_first(row, 'year_level', 'year'), 'year_level', blank=None) or None,
+        'num_meetings_non_lab': _parse_int(_first(row, 'num_meetings_non_lab', 'meetings'), 'num_meetings_non_lab'),
+    }
+
+
+CURRICULUM_COLUMNS = [
+    ('subject_code', 'VARCHAR(50)'),
+    ('subject_name', 'VARCHAR(255)'),
+    ('lecture_hours_per_week', 'INTEGER'),
+    ('lab_hours_per_week', 'INTEGER'),
+    ('units', 'INTEGER'),
+    ('semester', 'INTEGER'),
+    ('program_specialization', 'VARCHAR(255)'),
+    ('year_level', 'INTEGER'),
+]
+
+
+def _curriculum_dataset(program: str, label: str) -> Dict[str, Any]:
+    """Upload spec for one program's rows in the shared curriculum table"""
+    return {
+        'label': label,
+        'table': 'curriculum',
+        'key': ('program', 'subject_code'),
+        'columns': [('program', 'VARCHAR(20)')] + CURRICULUM_COLUMNS,
+        'normalize': lambda row: {'program': program, **normalize_curriculum_row(row)},
+    }
+
+
+# Upload name -> how to validate it and where it lands
+DATASETS: Dict[str, Dict[str, Any]] = {
+    'cs_curriculum': _curriculum_dataset('CS', 'CS Curriculum'),
+    'it_curriculum': _curriculum_dataset('IT', 'IT Curriculum'),
+    'teachers': {
+        'label': 'Teachers',
+        'table': 'teachers',
+        'key': ('teacher_id',),
+        'natural_key': 'teacher_name',
+        'id_prefix': 'T',
+        'columns': [('teacher_id', 'VARCHAR(20)'), ('teacher_name', 'VARCHAR(255)'), ('can_teach', 'TEXT')],
+        'normalize': normalize_teacher_row,
+    },
+    'rooms': {
+        'label': 'Rooms',
+        'table': 'rooms',
+        'key': ('room_id',),
+        'natural_key': 'room_name',
+        'id_prefix': 'R',
+        'columns': [('room_id', 'VARCHAR(20)'), ('room_name', 'VARCHAR(255)'), ('is_laboratory', 'BOOLEAN')],
+        'normalize': normalize_room_row,
+    },
+    'sections': {
+        'label': 'Sections',
+        'table': 'sections',
+        'key': ('section_id',),
+        'columns': [('section_id', 'VARCHAR(50)'), ('subject_code', 'VARCHAR(50)'),
+                    ('year_level', 'INTEGER'), ('num_meetings_non_lab', 'INTEGER')],
+        'normalize': normalize_section_row,
+    },
+}
+DATASETS['subjects'] = DATASETS['cs_curriculum']
+
+
+def _copy_value(value: Any) -> Any:
+    if value is None:
+        return COPY_NULL
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    return value
+
+
+class CsvIngestion:
+    """One all-or-nothing CSV upload.
+
+    Usage:
+        with CsvIngestion(db_manager, 'teachers') as ingestion:
+            ingestion.feed(rows)      # may be called repeatedly with batches
+            report = ingestion.finish()
+
+    Rows are (CSV line number, row) pairs as yielded by iter_csv_batches; each
+    row is a dict with lowercase, stripped keys and values. finish() commits
+    only when every row was valid; otherwise it rolls back and the report lists
+    the offending CSV lines.
+    """
+
+    def __init__(self, db_manager, dataset: str):
+        if dataset not in DATASETS:
+            raise KeyError(dataset)
+        self.db_manager = db_manager
+        self.spec = DATASETS[dataset]
+        self.columns = [name for name, _ in self.spec['columns']]
+        self.staging_table = f"staging_{self.spec['table']}"
+        self.conn = None
+        self.cursor = None
+        self.rows_seen = 0
+        self.rows_staged = 0
+        self.error_count = 0
+        self.errors: List[Dict[str, Any]] = []
+
+    def __enter__(self):
+        self.conn = self.db_manager.get_connection()
+        try:
+            self.cursor = self.conn.cursor()
+            column_defs = ', '.join(f"{name} {pg_type}" for name, pg_type in self.spec['columns'])
+            self.cursor.execute(
+                f"CREATE TEMP TABLE {self.staging_table} (row_no INTEGER, {column_defs}) ON COMMIT DROP"
+            )
+        except Exception:
+            # __exit__ does not run when __enter__ raises; release the connection here
+            self.__exit__(None, None, None)
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if self.conn is not None and not self.conn.closed:
+                self.conn.rollback()  # no-op after a successful finish()
+        finally:
+            if self.conn is not None:
+                self.conn.close()
+        return False
+
+    def _record_error(self, line_no: int, message: str):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line_no, 'error': message})
+
+    def feed(self, rows: Iterable[Tuple[int, Dict[str, str]]]) -> None:
+        """Validate a batch of (line number, row) pairs and COPY the valid ones into the staging table"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        normalize: Callable = self.spec['normalize']
+        staged = 0
+        for line_no, row in rows:
+            self.rows_seen += 1
+            try:
+                record = normalize(row)
+            except RowError as e:
+                self._record_error(line_no, str(e))
+                continue
+            if self.error_count:
+                # The upload is already rejected; keep validating but stop staging
+                continue
+            writer.writerow([line_no] + [_copy_value(record[c]) for c in self.columns])
+            staged += 1
+
+        if staged and not self.error_count:
+            buffer.seek(0)
+            self.cursor.copy_expert(
+                f"COPY {self.staging_table} (row_no, {', '.join(self.columns)}) "
+                f"FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')",
+                buffer
+            )
+            self.rows_staged += staged
+
+    def finish(self) -> Dict[str, Any]:
+        """Merge the staging table into the target table and commit (or roll back on errors)"""
+        report = {
+            'dataset': self.spec['label'],
+            'rows': self.rows_seen,
+            'loaded': 0,
+            'error_count': self.error_count,
+            'errors': self.errors,
+        }
+        if self.error_count or not self.rows_staged:
+            self.conn.rollback()
+            return report
+
+        self._resolve_missing_ids()
+        key = ', '.join(self.spec['key'])
+        column_list = ', '.join(self.columns)
+        updates = ', '.join(f"{c} = EXCLUDED.{c}" for c in self.columns if c not in self.spec['key'])
+        # Later rows win when the same key appears twice in one file
+        self.cursor.execute(f"""
+            INSERT INTO {self.spec['table']} ({column_list})
+            SELECT DISTINCT ON ({key}) {column_list}
+            FROM {self.staging_table}
+            ORDER BY {key}, row_no DESC
+            ON CONFLICT ({key}) DO UPDATE SET {updates}
+        """)
+        report['loaded'] = self.cursor.rowcount
+        self.conn.commit()
+        logger.info(f"Bulk loaded {report['loaded']} {self.spec['label']} rows from {self.rows_seen} CSV rows")
+        return report
+
+
+    def _resolve_missing_ids(self):
+        """Give ID-less rows the ID of the existing row with the same name, else one derived from the name"""
+        natural_key = self.spec.get('natural_key')
+        if not natural_key:
+            return
+        id_column = self.spec['key'][0]
+        table = self.spec['table']
+        self.cursor.execute(f"""
+            UPDATE {self.staging_table} AS s
+            SET {id_column} = COALESCE(
+                (SELECT t.{id_column} FROM {table} t
+                 WHERE lower(t.{natural_key}) = lower(s.{natural_key})
+                 ORDER BY t.{id_column} LIMIT 1),
+                %s || upper(left(md5(lower(s.{natural_key})), 8))
+            )
+            WHERE s.{id_column} IS NULL
+        """, (self.spec['id_prefix'],))
+
+
+def _normalize_keys(header: List[str], values: List[str]) -> Dict[str, str]:
+    """Pair a CSV record with the header using lowercase, stripped keys and stripped values"""
+    return {header[i]: (values[i] if i < len(values) else '').strip() for i in range(len(header))}
+
+
+def read_csv_rows(text: str) -> Iterable[Dict[str, str]]:
+    """Yield CSV rows with lowercase, stripped keys and stripped values"""
+    reader = csv.reader(io.StringIO(text))
+    header = None
+    for values in reader:
+        if header is None:
+            header = [h.strip().lower() for h in values]
+            continue
+        if values:
+            yield _normalize_keys(header, values)
+
+
+async def iter_csv_batches(upload, max_bytes: int, chunk_size: int = UPLOAD_CHUNK_SIZE,
+                           batch_size: int = UPLOAD_BATCH_SIZE) -> AsyncIterator[List[Tuple[int, Dict[str, str]]]]:
+    """Stream an uploaded CSV in fixed-size chunks and yield (line number, row) pairs in batches.
+
+    The payload is decoded incrementally (UTF-8, optional BOM) and split into
+    complete records, keeping quoted fields that span chunk boundaries intact.
+    Line numbers are the physical line each record starts on (blank lines and
+    multi-line quoted fields included). Only the current chunk and batch are
+    held in memory. UploadTooLarge is raised as soon as more than max_bytes
+    have been read.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    header: Optional[List[str]] = None
+    pending = ''  # trailing partial line of the previous chunk
+    record: List[str] = []  # lines of a record whose quoted field is still open
+    open_quote = False
+    batch: List[Tuple[int, Dict[str, str]]] = []
+    total = 0
+    lines_parsed = 0  # physical lines handed to the parser so far
+
+    def parse_records(lines: List[str]):
+        nonlocal header, lines_parsed
+        reader = csv.reader(lines)
+        start = lines_parsed + 1
+        for values in reader:
+            if header is None:
+                header = [h.strip().lower() for h in values]
+            elif values:
+                batch.append((start, _normalize_keys(header, values)))
+            start = lines_parsed + reader.line_num + 1
+        lines_parsed += len(lines)
+
+    while True:
+        chunk = await upload.read(chunk_size)
+        final = not chunk
+        if chunk:
+            total += len(chunk)
+            if total > max_bytes:
+                raise UploadTooLarge(f"File exceeds the maximum upload size of {max_bytes // (1024 * 1024)} MB")
+        text = pending + decoder.decode(chunk or b'', final=final)
+
+        # Only hand complete lines to the parser; keep the tail for the next chunk
+        cut = len(text) if final else text.rfind('\n') + 1
+        text, pending = text[:cut], text[cut:]
+
+        parts = text.split('\n')
+        lines = [part + '\n' for part in parts[:-1]] + ([parts[-1]] if parts[-1] else [])
+
+        complete = []
+        for line in lines:
+            record.append(line)
+            # An odd number of quotes leaves a quoted field open onto the next line
+            if line.count('"') % 2:
+                open_quote = not open_quote
+            if not open_quote:
+                complete.extend(record)
+                record = []
+        if final and record:
+            complete.extend(record)
+            record = []
+        parse_records(complete)
+
+        while len(batch) >= batch_size:
+            yield batch[:batch_size]
+            del batch[:batch_size]
+
+        if final:
+            break
+
+    if batch:
+        yield batch
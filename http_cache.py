@@ -0,0 +1,90 @@
+"""
+HTTP conditional request helpers (ETag / Last-Modified)
+
+Endpoints build a validator from something cheap to read (a reference-data
+version counter or a saved schedule's content hash), answer matching
+If-None-Match / If-Modified-Since requests with 304 before loading the payload,
+and attach the same headers to full responses. Responses are private and must
+be revalidated (they sit behind authentication and change on every upload).
+
+A compressed body is a different representation, so it gets its own ETag: the
+content coding is appended inside the quotes ('"<sha1>-gzip"'). etag_matches()
+ignores that suffix, so a client that switches codings can still revalidate.
+"""
+
+import hashlib
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any, Dict, Mapping, Optional
+
+CACHE_CONTROL = 'private, no-cache'
+# Content codings whose representations carry a suffixed ETag
+CODINGS = ('gzip', 'br')
+
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag over the given parts: '"<sha1>"'"""
+    digest = hashlib.sha1('|'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+    return f'"{digest}"'
+
+
+def coded_etag(etag: str, encoding: Optional[str]) -> str:
+    """ETag of the representation of etag's body sent with Content-Encoding encoding"""
+    if not encoding or not etag.endswith('"'):
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def _strip_coding(etag: str) -> str:
+    """Opaque tag without the W/ prefix and any content-coding suffix"""
+    if etag.startswith('W/'):
+        etag = etag[2:]
+    for encoding in CODINGS:
+        suffix = f'-{encoding}"'
+        if etag.endswith(suffix):
+            return etag[:-len(suffix)] + '"'
+    return etag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match comparison (weak, as RFC 9110 requires for GET; coding suffixes ignored)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    bare = _strip_coding(etag)
+    return any(_strip_coding(candidate.strip()) == bare for candidate in if_none_match.split(','))
+
+
+def not_modified_since(if_modified_since: Optional[str], last_modified: Optional[float]) -> bool:
+    """True when the resource (epoch seconds) is not newer than If-Modified-Since"""
+    if not if_modified_since or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since).timestamp()
+    except (TypeError, ValueError):
+        return False
+    return int(last_modified) <= since
+
+
+def is_fresh(headers: Mapping[str, str], etag: str, last_modified: Optional[float] = None) -> bool:
+    """Whether a conditional GET can be answered with 304 (If-None-Match takes precedence)"""
+    if_none_match = headers.get('if-none-match')
+    if if_none_match:
+        return etag_matches(if_none_match, etag)
+    return not_modified_since(headers.get('if-modified-since'), last_modified)
+
+
+def validator_headers(etag: str, last_modified: Optional[float] = None) -> Dict[str, str]:
+    """ETag, Last-Modified and revalidation headers for a cacheable response"""
+    headers = {'ETag': etag, 'Cache-Control': CACHE_CONTROL, 'Vary': 'Authorization'}
+    if last_modified is not None:
+        headers['Last-Modified'] = formatdate(int(last_modified), usegmt=True)
+    return headers
+
+
+def not_modified_headers(etag: str, last_modified: Optional[float] = None,
+                         encoding: Optional[str] = None) -> Dict[str, str]:
+    """validator_headers() for a 304: the ETag of the representation in the negotiated coding"""
+    headers = validator_headers(coded_etag(etag, encoding), last_modified)
+    headers['Vary'] = 'Authorization, Accept-Encoding'
+    return headers
@@ -3,7 +3,7 @@
 Migration script to populate PostgreSQL database with CSV data
 """
 
-from database import db
+from database import bootstrap_database, db
 
 def main():
     print("🚀 Starting migration from CSV to PostgreSQL...")
@@ -16,6 +16,9 @@ def main():
         test_connection.close()
         print("✅ Database connection successful!")
         
+        # Apply migrations and default users/settings (no longer done on import)
+        bootstrap_database()
+        
         # Migrate data from CSV files
         print("\n📥 Migrating data from CSV files...")
         db.migrate_from_csv()
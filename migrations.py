@@ -0,0 +1,811 @@
+#!/usr/bin/env python3
+"""
+Versioned schema migrations for IntelliSched
+
+Each migration is a (version, description, steps) tuple. A step is either a
+SQL string or a callable taking the open cursor (for data backfills). Pending
+migrations are applied once, in order, inside a single transaction, and the
+applied versions are recorded in the schema_migrations table. When the schema
+is already current no DDL is executed at all.
+"""
+
+import json
+import logging
+from typing import Callable, List, Tuple, Union
+
+from psycopg2.extras import execute_batch
+
+from schedule_codec import encode_for_storage
+from schedule_utils import schedule_entries, schedule_summary, write_schedule_entries
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary application-wide key for pg_advisory_xact_lock so concurrent
+# workers booting at the same time do not race each other through the DDL
+MIGRATION_LOCK_KEY = 7243011
+
+Step = Union[str, Callable]
+
+INITIAL_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS cs_curriculum (
+    id SERIAL PRIMARY KEY,
+    subject_code VARCHAR(50) UNIQUE NOT NULL,
+    subject_name VARCHAR(255) NOT NULL,
+    lecture_hours_per_week INTEGER DEFAULT 0,
+    lab_hours_per_week INTEGER DEFAULT 0,
+    units INTEGER DEFAULT 0,
+    semester INTEGER,
+    program_specialization VARCHAR(255),
+    year_level INTEGER
+);
+
+-- IT curriculum table (mirrors CS curriculum)
+CREATE TABLE IF NOT EXISTS it_curriculum (
+    id SERIAL PRIMARY KEY,
+    subject_code VARCHAR(50) UNIQUE NOT NULL,
+    subject_name VARCHAR(255) NOT NULL,
+    lecture_hours_per_week INTEGER DEFAULT 0,
+    lab_hours_per_week INTEGER DEFAULT 0,
+    units INTEGER DEFAULT 0,
+    semester INTEGER,
+    program_specialization VARCHAR(255),
+    year_level INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS teachers (
+    id SERIAL PRIMARY KEY,
+    teacher_id VARCHAR(20) UNIQUE NOT NULL,
+    teacher_name VARCHAR(255) NOT NULL,
+    can_teach TEXT,
+    availability_days TEXT
+);
+
+CREATE TABLE IF NOT EXISTS rooms (
+    id SERIAL PRIMARY KEY,
+    room_id VARCHAR(20) UNIQUE NOT NULL,
+    room_name VARCHAR(255) NOT NULL,
+    is_laboratory BOOLEAN DEFAULT FALSE
+);
+
+CREATE TABLE IF NOT EXISTS sections (
+    id SERIAL PRIMARY KEY,
+    section_id VARCHAR(50) UNIQUE NOT NULL,
+    subject_code VARCHAR(50),
+    year_level INTEGER,
+    num_meetings_non_lab INTEGER DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS users (
+    id SERIAL PRIMARY KEY,
+    username VARCHAR(50) UNIQUE NOT NULL,
+    password_hash VARCHAR(255) NOT NULL,
+    salt VARCHAR(255) NOT NULL,
+    full_name VARCHAR(255),
+    email VARCHAR(255) UNIQUE,
+    role VARCHAR(20) DEFAULT 'user',
+    status VARCHAR(20) DEFAULT 'pending',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    last_login TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS schedule_approvals (
+    id SERIAL PRIMARY KEY,
+    schedule_id VARCHAR(50) NOT NULL,
+    schedule_name VARCHAR(255),
+    semester INTEGER,
+    status VARCHAR(20) DEFAULT 'pending',
+    created_by VARCHAR(50),
+    approved_by VARCHAR(50),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    approved_at TIMESTAMP,
+    comments TEXT
+);
+
+CREATE TABLE IF NOT EXISTS notifications (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER REFERENCES users(id),
+    title VARCHAR(255) NOT NULL,
+    message TEXT NOT NULL,
+    type VARCHAR(50) DEFAULT 'info',
+    is_read BOOLEAN DEFAULT FALSE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS system_settings (
+    id SERIAL PRIMARY KEY,
+    setting_key VARCHAR(100) UNIQUE NOT NULL,
+    setting_value TEXT,
+    setting_type VARCHAR(50) DEFAULT 'string',
+    description TEXT,
+    updated_by VARCHAR(50),
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS system_analytics (
+    id SERIAL PRIMARY KEY,
+    metric_name VARCHAR(100) NOT NULL,
+    metric_value NUMERIC,
+    metric_data JSONB,
+    recorded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS user_activity_log (
+    id SERIAL PRIMARY KEY,
+    user_id INTEGER REFERENCES users(id),
+    activity_type VARCHAR(100) NOT NULL,
+    activity_description TEXT,
+    ip_address INET,
+    user_agent TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS saved_schedules (
+    id SERIAL PRIMARY KEY,
+    schedule_id VARCHAR(50) UNIQUE NOT NULL,
+    schedule_name VARCHAR(255) NOT NULL,
+    semester INTEGER,
+    created_by VARCHAR(50) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    schedule_data JSONB NOT NULL
+);
+
+-- Idempotent schema fix for deployments created before availability existed
+ALTER TABLE teachers ADD COLUMN IF NOT EXISTS availability_days TEXT DEFAULT 'Mon,Tue,Wed,Thu,Fri,Sat';
+"""
+
+HOT_PATH_INDEXES_SQL = """
+-- Dean queues: pending ordered by submission, approved ordered by approval
+CREATE INDEX IF NOT EXISTS idx_schedule_approvals_status_created
+    ON schedule_approvals (status, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_schedule_approvals_status_approved
+    ON schedule_approvals (status, approved_at DESC);
+-- Per-schedule status lookups (approve/reject/delete/status endpoints)
+CREATE INDEX IF NOT EXISTS idx_schedule_approvals_schedule_id
+    ON schedule_approvals (schedule_id);
+
+-- Notification bell: a user's (unread) notifications, newest first
+CREATE INDEX IF NOT EXISTS idx_notifications_user_read_created
+    ON notifications (user_id, is_read, created_at DESC);
+
+-- Analytics windows
+CREATE INDEX IF NOT EXISTS idx_user_activity_log_created
+    ON user_activity_log (created_at);
+CREATE INDEX IF NOT EXISTS idx_system_analytics_metric_recorded
+    ON system_analytics (metric_name, recorded_at DESC);
+
+-- Saved schedule listings per chair and overall
+CREATE INDEX IF NOT EXISTS idx_saved_schedules_created_by_created
+    ON saved_schedules (created_by, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_saved_schedules_created
+    ON saved_schedules (created_at DESC);
+"""
+
+SAVED_SCHEDULE_SUMMARY_SQL = """
+ALTER TABLE saved_schedules ADD COLUMN IF NOT EXISTS entry_count INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE saved_schedules ADD COLUMN IF NOT EXISTS section_count INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE saved_schedules ADD COLUMN IF NOT EXISTS teacher_count INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE saved_schedules ADD COLUMN IF NOT EXISTS content_hash CHAR(64);
+
+-- Latest saved schedule for a semester (download_schedule?semester=)
+CREATE INDEX IF NOT EXISTS idx_saved_schedules_semester_created
+    ON saved_schedules (semester, created_at DESC);
+"""
+
+
+def _backfill_saved_schedule_summaries(cursor):
+    """Compute summary columns for schedules saved before they existed"""
+    cursor.execute("SELECT id, schedule_data FROM saved_schedules WHERE content_hash IS NULL")
+    updates = []
+    for row_id, schedule_data in cursor.fetchall():
+        summary = schedule_summary(schedule_data)
+        updates.append((
+            summary['entry_count'],
+            summary['section_count'],
+            summary['teacher_count'],
+            summary['content_hash'],
+            row_id
+        ))
+    execute_batch(cursor, """
+        UPDATE saved_schedules
+        SET entry_count = %s, section_count = %s, teacher_count = %s, content_hash = %s
+        WHERE id = %s
+    """, updates)
+
+
+SAVED_SCHEDULE_DASHBOARD_SQL = """
+-- Approval-only rows on a chair's saved schedule dashboard
+CREATE INDEX IF NOT EXISTS idx_schedule_approvals_created_by
+    ON schedule_approvals (created_by, schedule_id, created_at DESC);
+"""
+
+
+SCHEDULE_ENTRIES_SQL = """
+-- One row per meeting of a saved schedule, so cross-schedule questions are indexed SQL
+CREATE TABLE IF NOT EXISTS schedule_entries (
+    schedule_id VARCHAR(50) NOT NULL REFERENCES saved_schedules(schedule_id) ON DELETE CASCADE,
+    entry_index INTEGER NOT NULL,
+    section_id VARCHAR(50),
+    subject_code VARCHAR(50),
+    subject_name VARCHAR(255),
+    entry_type VARCHAR(20),
+    teacher_id VARCHAR(20),
+    teacher_name VARCHAR(255),
+    room_id VARCHAR(20),
+    room_name VARCHAR(255),
+    day SMALLINT NOT NULL,
+    start_slot SMALLINT NOT NULL,
+    duration_slots SMALLINT NOT NULL DEFAULT 1,
+    PRIMARY KEY (schedule_id, entry_index)
+);
+
+CREATE INDEX IF NOT EXISTS idx_schedule_entries_teacher
+    ON schedule_entries (teacher_id, day, start_slot);
+CREATE INDEX IF NOT EXISTS idx_schedule_entries_room
+    ON schedule_entries (room_id, day, start_slot);
+CREATE INDEX IF NOT EXISTS idx_schedule_entries_section
+    ON schedule_entries (section_id, day, start_slot);
+"""
+
+
+def _backfill_schedule_entries(cursor):
+    """Populate schedule_entries from the JSONB blobs of existing saved schedules"""
+    cursor.execute("SELECT schedule_id FROM saved_schedules ORDER BY id")
+    for (schedule_id,) in cursor.fetchall():
+        # Load one blob at a time so the backfill does not hold every schedule in memory
+        cursor.execute("SELECT schedule_data FROM saved_schedules WHERE schedule_id = %s", (schedule_id,))
+        write_schedule_entries(cursor, schedule_id, cursor.fetchone()[0])
+
+
+TIMETABLE_LOOKUP_SQL = """
+-- Latest approval per schedule (timetable views only read approved schedules)
+CREATE INDEX IF NOT EXISTS idx_schedule_approvals_schedule_created
+    ON schedule_approvals (schedule_id, created_at DESC);
+"""
+
+
+UNIFIED_CURRICULUM_SQL = """
+-- One curriculum table for every program; (program, subject_code) is the key
+CREATE TABLE IF NOT EXISTS curriculum (
+    id SERIAL PRIMARY KEY,
+    program VARCHAR(20) NOT NULL,
+    subject_code VARCHAR(50) NOT NULL,
+    subject_name VARCHAR(255) NOT NULL,
+    lecture_hours_per_week INTEGER DEFAULT 0,
+    lab_hours_per_week INTEGER DEFAULT 0,
+    units INTEGER DEFAULT 0,
+    semester INTEGER,
+    program_specialization VARCHAR(255),
+    year_level INTEGER,
+    UNIQUE (program, subject_code)
+);
+
+CREATE INDEX IF NOT EXISTS idx_curriculum_program_order
+    ON curriculum (program, year_level, semester, subject_code);
+
+-- Move the per-program tables into curriculum and keep them around as *_legacy
+DO $$
+DECLARE
+    legacy RECORD;
+BEGIN
+    FOR legacy IN SELECT * FROM (VALUES ('CS', 'cs_curriculum'), ('IT', 'it_curriculum')) AS t(program, tbl) LOOP
+        IF (SELECT relkind FROM pg_class WHERE oid = to_regclass('public.' || legacy.tbl)) = 'r' THEN
+            EXECUTE format(
+                'INSERT INTO curriculum (program, subject_code, subject_name, lecture_hours_per_week,
+                                         lab_hours_per_week, units, semester, program_specialization, year_level)
+                 SELECT %L, subject_code, subject_name, lecture_hours_per_week,
+                        lab_hours_per_week, units, semester, program_specialization, year_level
+                 FROM %I
+                 ON CONFLICT (program, subject_code) DO NOTHING',
+                legacy.program, legacy.tbl);
+            EXECUTE format('ALTER TABLE %I RENAME TO %I', legacy.tbl, legacy.tbl || '_legacy');
+        END IF;
+    END LOOP;
+END $$;
+
+-- Compatibility views for scripts that still read the old per-program tables
+CREATE OR REPLACE VIEW cs_curriculum AS
+    SELECT id, subject_code, subject_name, lecture_hours_per_week, lab_hours_per_week,
+           units, semester, program_specialization, year_level
+    FROM curriculum WHERE program = 'CS';
+CREATE OR REPLACE VIEW it_curriculum AS
+    SELECT id, subject_code, subject_name, lecture_hours_per_week, lab_hours_per_week,
+           units, semester, program_specialization, year_level
+    FROM curriculum WHERE program = 'IT';
+"""
+
+
+TEACHER_QUALIFICATIONS_SQL = """
+-- One row per (teacher, subject) a teacher can teach, derived from teachers.can_teach
+CREATE TABLE IF NOT EXISTS teacher_qualifications (
+    teacher_id VARCHAR(20) NOT NULL REFERENCES teachers(teacher_id) ON DELETE CASCADE ON UPDATE CASCADE,
+    subject_code VARCHAR(50) NOT NULL,
+    PRIMARY KEY (teacher_id, subject_code)
+);
+
+-- "Who can teach X" (the primary key covers "what can teacher Y teach")
+CREATE INDEX IF NOT EXISTS idx_teacher_qualifications_subject
+    ON teacher_qualifications (subject_code, teacher_id);
+
+-- can_teach holds comma-separated codes (or an array literal such as {CS1,CS2})
+CREATE OR REPLACE FUNCTION sync_teacher_qualifications() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.can_teach IS NOT DISTINCT FROM NEW.can_teach THEN
+        RETURN NULL;
+    END IF;
+    DELETE FROM teacher_qualifications WHERE teacher_id = NEW.teacher_id;
+    INSERT INTO teacher_qualifications (teacher_id, subject_code)
+    SELECT DISTINCT NEW.teacher_id, code
+    FROM regexp_split_to_table(translate(COALESCE(NEW.can_teach, ''), '{}" ', ''), ',') AS code
+    WHERE code <> '';
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_teachers_sync_qualifications ON teachers;
+CREATE TRIGGER trg_teachers_sync_qualifications
+    AFTER INSERT OR UPDATE OF can_teach ON teachers
+    FOR EACH ROW EXECUTE FUNCTION sync_teacher_qualifications();
+
+-- Backfill existing teachers
+INSERT INTO teacher_qualifications (teacher_id, subject_code)
+SELECT DISTINCT t.teacher_id, code
+FROM teachers t, regexp_split_to_table(translate(COALESCE(t.can_teach, ''), '{}" ', ''), ',') AS code
+WHERE code <> ''
+ON CONFLICT DO NOTHING;
+"""
+
+
+TEACHER_AVAILABILITY_MASK_SQL = """
+-- Day x window availability bitmask (see availability.py); 4095 = every window of Mon-Sat
+ALTER TABLE teachers ADD COLUMN IF NOT EXISTS availability_mask INTEGER NOT NULL DEFAULT 4095;
+
+-- availability_days was stored as 'Mon,Tue', '{Mon,Tue}' or NULL; empty means always available
+UPDATE teachers SET availability_mask = COALESCE(NULLIF(
+      (CASE WHEN availability_days ILIKE '%mon%' THEN 3 ELSE 0 END)
+    | (CASE WHEN availability_days ILIKE '%tue%' THEN 12 ELSE 0 END)
+    | (CASE WHEN availability_days ILIKE '%wed%' THEN 48 ELSE 0 END)
+    | (CASE WHEN availability_days ILIKE '%thu%' THEN 192 ELSE 0 END)
+    | (CASE WHEN availability_days ILIKE '%fri%' THEN 768 ELSE 0 END)
+    | (CASE WHEN availability_days ILIKE '%sat%' THEN 3072 ELSE 0 END),
+    0), 4095);
+"""
+
+
+TEACHER_AVAILABILITY_WINDOWS_SQL = """
+-- Time-of-day availability on the 30-minute slot grid (end_slot exclusive, 22 = 18:00).
+-- Days with windows replace the AM/PM bits of availability_mask for that day.
+CREATE TABLE IF NOT EXISTS teacher_availability_windows (
+    teacher_id VARCHAR(20) NOT NULL REFERENCES teachers(teacher_id) ON DELETE CASCADE ON UPDATE CASCADE,
+    day SMALLINT NOT NULL CHECK (day BETWEEN 0 AND 5),
+    start_slot SMALLINT NOT NULL CHECK (start_slot >= 0),
+    end_slot SMALLINT NOT NULL CHECK (end_slot <= 22),
+    PRIMARY KEY (teacher_id, day, start_slot),
+    CHECK (start_slot < end_slot)
+);
+"""
+
+
+ANALYTICS_ROLLUPS_SQL = """
+-- Daily activity counts per type and user (maintained by the telemetry writer)
+CREATE TABLE IF NOT EXISTS activity_daily_rollup (
+    day DATE NOT NULL,
+    activity_type VARCHAR(100) NOT NULL,
+    user_id INTEGER NOT NULL DEFAULT 0,  -- 0 = anonymous
+    activity_count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, activity_type, user_id)
+);
+CREATE INDEX IF NOT EXISTS idx_activity_daily_rollup_user
+    ON activity_daily_rollup (user_id, day);
+
+-- Registrations per day, users per (role, status) and approvals per status (maintained by triggers)
+CREATE TABLE IF NOT EXISTS registration_daily_rollup (
+    day DATE PRIMARY KEY,
+    registration_count BIGINT NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS user_status_counts (
+    role VARCHAR(20) NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    user_count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (role, status)
+);
+CREATE TABLE IF NOT EXISTS schedule_status_counts (
+    status VARCHAR(20) PRIMARY KEY,
+    schedule_count BIGINT NOT NULL DEFAULT 0
+);
+-- Row counts of reference data tables (maintained by statement-level triggers)
+CREATE TABLE IF NOT EXISTS table_row_counts (
+    table_name VARCHAR(63) PRIMARY KEY,
+    row_count BIGINT NOT NULL DEFAULT 0
+);
+
+CREATE OR REPLACE FUNCTION rollup_users() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE user_status_counts SET user_count = user_count - 1
+        WHERE role = COALESCE(OLD.role, 'user') AND status = COALESCE(OLD.status, 'pending');
+    END IF;
+    IF TG_OP = 'DELETE' THEN
+        UPDATE registration_daily_rollup SET registration_count = registration_count - 1
+        WHERE day = OLD.created_at::date;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO user_status_counts (role, status, user_count)
+        VALUES (COALESCE(NEW.role, 'user'), COALESCE(NEW.status, 'pending'), 1)
+        ON CONFLICT (role, status) DO UPDATE SET user_count = user_status_counts.user_count + 1;
+    END IF;
+    IF TG_OP = 'INSERT' AND NEW.created_at IS NOT NULL THEN
+        INSERT INTO registration_daily_rollup (day, registration_count) VALUES (NEW.created_at::date, 1)
+        ON CONFLICT (day) DO UPDATE SET registration_count = registration_daily_rollup.registration_count + 1;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_users_rollup ON users;
+CREATE TRIGGER trg_users_rollup
+    AFTER INSERT OR DELETE OR UPDATE OF role, status ON users
+    FOR EACH ROW EXECUTE FUNCTION rollup_users();
+
+CREATE OR REPLACE FUNCTION rollup_schedule_status() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE schedule_status_counts SET schedule_count = schedule_count - 1
+        WHERE status = COALESCE(OLD.status, 'pending');
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO schedule_status_counts (status, schedule_count) VALUES (COALESCE(NEW.status, 'pending'), 1)
+        ON CONFLICT (status) DO UPDATE SET schedule_count = schedule_status_counts.schedule_count + 1;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_schedule_approvals_rollup ON schedule_approvals;
+CREATE TRIGGER trg_schedule_approvals_rollup
+    AFTER INSERT OR DELETE OR UPDATE OF status ON schedule_approvals
+    FOR EACH ROW EXECUTE FUNCTION rollup_schedule_status();
+
+-- One counter update per statement, so bulk CSV uploads stay cheap
+CREATE OR REPLACE FUNCTION rollup_row_count() RETURNS TRIGGER AS $$
+DECLARE
+    delta BIGINT;
+BEGIN
+    SELECT count(*) INTO delta FROM changed_rows;
+    IF TG_OP = 'DELETE' THEN
+        delta := -delta;
+    END IF;
+    IF delta <> 0 THEN
+        INSERT INTO table_row_counts (table_name, row_count) VALUES (TG_TABLE_NAME, delta)
+        ON CONFLICT (table_name) DO UPDATE SET row_count = table_row_counts.row_count + EXCLUDED.row_count;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    tbl TEXT;
+BEGIN
+    FOREACH tbl IN ARRAY ARRAY['curriculum', 'teachers', 'rooms', 'sections'] LOOP
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_%s_count_insert ON %I', tbl, tbl);
+        EXECUTE format('CREATE TRIGGER trg_%s_count_insert AFTER INSERT ON %I
+                        REFERENCING NEW TABLE AS changed_rows
+                        FOR EACH STATEMENT EXECUTE FUNCTION rollup_row_count()', tbl, tbl);
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_%s_count_delete ON %I', tbl, tbl);
+        EXECUTE format('CREATE TRIGGER trg_%s_count_delete AFTER DELETE ON %I
+                        REFERENCING OLD TABLE AS changed_rows
+                        FOR EACH STATEMENT EXECUTE FUNCTION rollup_row_count()', tbl, tbl);
+    END LOOP;
+END $$;
+"""
+
+# Rebuilds every rollup from the raw tables. Applied once by the migration and
+# available as a repair job (refresh_analytics_rollups) after e.g. a TRUNCATE.
+REFRESH_ANALYTICS_ROLLUPS_SQL = """
+TRUNCATE activity_daily_rollup, registration_daily_rollup, user_status_counts,
+         schedule_status_counts, table_row_counts;
+
+INSERT INTO activity_daily_rollup (day, activity_type, user_id, activity_count)
+SELECT created_at::date, activity_type, COALESCE(user_id, 0), COUNT(*)
+FROM user_activity_log
+GROUP BY 1, 2, 3;
+
+INSERT INTO registration_daily_rollup (day, registration_count)
+SELECT created_at::date, COUNT(*) FROM users WHERE created_at IS NOT NULL GROUP BY 1;
+
+INSERT INTO user_status_counts (role, status, user_count)
+SELECT COALESCE(role, 'user'), COALESCE(status, 'pending'), COUNT(*) FROM users GROUP BY 1, 2;
+
+INSERT INTO schedule_status_counts (status, schedule_count)
+SELECT COALESCE(status, 'pending'), COUNT(*) FROM schedule_approvals GROUP BY 1;
+
+INSERT INTO table_row_counts (table_name, row_count)
+SELECT 'curriculum', COUNT(*) FROM curriculum
+UNION ALL SELECT 'teachers', COUNT(*) FROM teachers
+UNION ALL SELECT 'rooms', COUNT(*) FROM rooms
+UNION ALL SELECT 'sections', COUNT(*) FROM sections;
+"""
+
+
+MONTHLY_PARTITION_FUNCTION_SQL = """
+-- Create (idempotently) the partition of parent covering the month starting at
+-- month_start. Rows of that month already sitting in the default partition are
+-- moved into the new partition before it is attached.
+CREATE OR REPLACE FUNCTION ensure_monthly_partition(parent TEXT, key_column TEXT, month_start DATE)
+RETURNS TEXT AS $$
+DECLARE
+    part TEXT := format('%s_p%s', parent, to_char(month_start, 'YYYY_MM'));
+    next_month DATE := (month_start + INTERVAL '1 month')::date;
+BEGIN
+    IF to_regclass(part) IS NOT NULL THEN
+        RETURN part;
+    END IF;
+    EXECUTE format('CREATE TABLE %I (LIKE %I INCLUDING DEFAULTS)', part, parent);
+    IF to_regclass(parent || '_default') IS NOT NULL THEN
+        EXECUTE format(
+            'WITH moved AS (DELETE FROM %I WHERE %I >= %L AND %I < %L RETURNING *) INSERT INTO %I SELECT * FROM moved',
+            parent || '_default', key_column, month_start, key_column, next_month, part
+        );
+    END IF;
+    EXECUTE format('ALTER TABLE %I ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                   parent, part, month_start, next_month);
+    RETURN part;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+# table -> (range key, column definitions, index statements)
+PARTITIONED_LOG_TABLES = {
+    'user_activity_log': ('created_at', """
+        id INTEGER NOT NULL DEFAULT nextval('user_activity_log_id_seq'),
+        user_id INTEGER REFERENCES users(id),
+        activity_type VARCHAR(100) NOT NULL,
+        activity_description TEXT,
+        ip_address INET,
+        user_agent TEXT,
+        created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (id, created_at)
+    """, [
+        "CREATE INDEX IF NOT EXISTS idx_user_activity_log_created ON user_activity_log (created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_user_activity_log_user ON user_activity_log (user_id)",
+    ]),
+    'system_analytics': ('recorded_at', """
+        id INTEGER NOT NULL DEFAULT nextval('system_analytics_id_seq'),
+        metric_name VARCHAR(100) NOT NULL,
+        metric_value NUMERIC,
+        metric_data JSONB,
+        recorded_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (id, recorded_at)
+    """, [
+        "CREATE INDEX IF NOT EXISTS idx_system_analytics_metric_recorded ON system_analytics (metric_name, recorded_at DESC)",
+    ]),
+}
+
+
+def _partition_log_tables(cursor):
+    """Rebuild the activity log and metric tables as monthly range-partitioned tables"""
+    for table, (key, columns, indexes) in PARTITIONED_LOG_TABLES.items():
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)", (table,)
+        )
+        if cursor.fetchone():
+            continue
+
+        old = f"{table}_unpartitioned"
+        cursor.execute(f"ALTER TABLE {table} RENAME TO {old}")
+        cursor.execute(f"ALTER INDEX IF EXISTS {table}_pkey RENAME TO {old}_pkey")
+        cursor.execute(f"CREATE TABLE {table} ({columns}) PARTITION BY RANGE ({key})")
+        cursor.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+
+        # One partition per month that has data, through next month
+        cursor.execute(f"""
+            SELECT ensure_monthly_partition(%s, %s, month::date)
+            FROM generate_series(
+                date_trunc('month', LEAST(COALESCE((SELECT MIN({key}) FROM {old}), NOW()), NOW())),
+                date_trunc('month', NOW()) + INTERVAL '1 month',
+                INTERVAL '1 month'
+            ) AS month
+        """, (table, key))
+
+        column_names = [line.split()[0] for line in columns.strip().splitlines()
+                        if not line.strip().startswith('PRIMARY')]
+        select_list = [f"COALESCE({key}, CURRENT_TIMESTAMP)" if name == key else name for name in column_names]
+        cursor.execute(
+            f"INSERT INTO {table} ({', '.join(column_names)}) SELECT {', '.join(select_list)} FROM {old}"
+        )
+        cursor.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+        cursor.execute(f"DROP TABLE {old}")
+        for statement in indexes:
+            cursor.execute(statement)
+
+
+DATA_VERSIONS_SQL = """
+-- Version counter per reference dataset, bumped by statement-level triggers.
+-- HTTP endpoints derive ETag/Last-Modified from it without reading the data.
+CREATE TABLE IF NOT EXISTS data_versions (
+    name VARCHAR(50) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 1,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+INSERT INTO data_versions (name)
+VALUES ('curriculum'), ('teachers'), ('rooms'), ('sections')
+ON CONFLICT (name) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION bump_data_version() RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO data_versions (name) VALUES (TG_ARGV[0])
+    ON CONFLICT (name) DO UPDATE SET version = data_versions.version + 1, updated_at = now();
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    src RECORD;
+BEGIN
+    FOR src IN
+        SELECT * FROM (VALUES
+            ('curriculum', 'curriculum'),
+            ('teachers', 'teachers'),
+            ('teacher_availability_windows', 'teachers'),
+            ('rooms', 'rooms'),
+            ('sections', 'sections')
+        ) AS s(tbl, dataset)
+    LOOP
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_%s_data_version ON %I', src.tbl, src.tbl);
+        EXECUTE format('CREATE TRIGGER trg_%s_data_version
+                        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON %I
+                        FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version(%L)',
+                       src.tbl, src.tbl, src.dataset);
+    END LOOP;
+END $$;
+"""
+
+
+SCHEDULE_BLOBS_SQL = """
+-- Saved schedule contents, stored once per distinct content hash and referenced by
+-- any number of saved_schedules rows (save, generate and persist flows often store
+-- the same schedule). encoding says how blob is laid out (see schedule_codec.py).
+CREATE TABLE IF NOT EXISTS schedule_blobs (
+    content_hash CHAR(64) PRIMARY KEY,
+    encoding VARCHAR(20) NOT NULL,
+    blob JSONB NOT NULL,
+    entry_count INTEGER NOT NULL DEFAULT 0,
+    -- Touched by every save; unreferenced blobs are pruned once this is old enough
+    last_saved_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- schedule_data is only kept for rows written before blobs existed
+ALTER TABLE saved_schedules ALTER COLUMN schedule_data DROP NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_saved_schedules_content_hash
+    ON saved_schedules (content_hash);
+"""
+
+
+def _move_schedules_to_blobs(cursor):
+    """Re-encode inline schedule_data into deduplicated schedule_blobs"""
+    cursor.execute("SELECT schedule_id FROM saved_schedules WHERE schedule_data IS NOT NULL ORDER BY id")
+    for (schedule_id,) in cursor.fetchall():
+        # One blob at a time, as in _backfill_schedule_entries
+        cursor.execute("SELECT schedule_data FROM saved_schedules WHERE schedule_id = %s", (schedule_id,))
+        entries = schedule_entries(cursor.fetchone()[0])
+        summary = schedule_summary(entries)
+        encoding, blob = encode_for_storage(entries)
+        cursor.execute("""
+            INSERT INTO schedule_blobs (content_hash, encoding, blob, entry_count)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT (content_hash) DO NOTHING
+        """, (summary['content_hash'], encoding, json.dumps(blob), summary['entry_count']))
+        cursor.execute(
+            "UPDATE saved_schedules SET content_hash = %s, schedule_data = NULL WHERE schedule_id = %s",
+            (summary['content_hash'], schedule_id)
+        )
+
+
+SCHEDULE_BLOBS_FOREIGN_KEY_SQL = """
+ALTER TABLE saved_schedules
+    ADD CONSTRAINT saved_schedules_content_hash_fkey
+    FOREIGN KEY (content_hash) REFERENCES schedule_blobs (content_hash);
+"""
+
+
+SCHEDULE_VERSIONS_SQL = """
+-- A version may be stored as a delta against the full blob of its lineage
+-- (encoding 'delta-v1'); bases are never deltas themselves
+ALTER TABLE schedule_blobs ADD COLUMN IF NOT EXISTS base_hash CHAR(64)
+    REFERENCES schedule_blobs (content_hash);
+CREATE INDEX IF NOT EXISTS idx_schedule_blobs_base_hash
+    ON schedule_blobs (base_hash) WHERE base_hash IS NOT NULL;
+
+-- Previous version of a saved schedule (explicit, or the latest save with the same
+-- owner, name and semester)
+ALTER TABLE saved_schedules ADD COLUMN IF NOT EXISTS parent_id VARCHAR(50)
+    REFERENCES saved_schedules (schedule_id) ON DELETE SET NULL;
+CREATE INDEX IF NOT EXISTS idx_saved_schedules_lineage
+    ON saved_schedules (created_by, schedule_name, semester, created_at DESC);
+"""
+
+
+# Ordered list of all migrations. Never edit or reorder an applied migration;
+# append a new one instead.
+MIGRATIONS: List[Tuple[int, str, List[Step]]] = [
+    (1, 'Initial schema', [INITIAL_SCHEMA_SQL]),
+    (2, 'Hot-path indexes', [HOT_PATH_INDEXES_SQL]),
+    (3, 'Saved schedule summary columns', [SAVED_SCHEDULE_SUMMARY_SQL, _backfill_saved_schedule_summaries]),
+    (4, 'Saved schedule dashboard index', [SAVED_SCHEDULE_DASHBOARD_SQL]),
+    (5, 'Normalized schedule entries', [SCHEDULE_ENTRIES_SQL, _backfill_schedule_entries]),
+    (6, 'Timetable lookup index', [TIMETABLE_LOOKUP_SQL]),
+    (7, 'Unified curriculum table', [UNIFIED_CURRICULUM_SQL]),
+    (8, 'Teacher qualifications', [TEACHER_QUALIFICATIONS_SQL]),
+    (9, 'Teacher availability bitmask', [TEACHER_AVAILABILITY_MASK_SQL]),
+    (10, 'Teacher availability windows', [TEACHER_AVAILABILITY_WINDOWS_SQL]),
+    (11, 'Analytics rollups', [ANALYTICS_ROLLUPS_SQL, REFRESH_ANALYTICS_ROLLUPS_SQL]),
+    (12, 'Monthly partitions for activity log and metrics', [MONTHLY_PARTITION_FUNCTION_SQL, _partition_log_tables]),
+    (13, 'Reference data versions for HTTP caching', [DATA_VERSIONS_SQL]),
+    (14, 'Deduplicated compact schedule blobs', [SCHEDULE_BLOBS_SQL, _move_schedules_to_blobs, SCHEDULE_BLOBS_FOREIGN_KEY_SQL]),
+    (15, 'Schedule version lineage and delta blobs', [SCHEDULE_VERSIONS_SQL]),
+]
+
+LATEST_VERSION = max(version for version, _, _ in MIGRATIONS)
+
+
+def _current_version(cursor) -> int:
+    """Return the applied schema version (0 when the version table is missing)"""
+    cursor.execute("SELECT to_regclass('public.schema_migrations') IS NOT NULL")
+    if not cursor.fetchone()[0]:
+        return 0
+    cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_migrations")
+    return cursor.fetchone()[0]
+
+
+def apply_migrations(db_manager) -> int:
+    """Apply all pending migrations in one transaction and return the new schema version"""
+    with db_manager.get_connection() as conn:
+        with conn.cursor() as cursor:
+            current = _current_version(cursor)
+            if current >= LATEST_VERSION:
+                logger.debug(f"Schema is current (version {current}); skipping migrations")
+                return current
+
+            # Serialize concurrent boots, then re-check under the lock
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", (MIGRATION_LOCK_KEY,))
+            current = _current_version(cursor)
+            if current >= LATEST_VERSION:
+                conn.commit()
+                return current
+
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS schema_migrations (
+                    version INTEGER PRIMARY KEY,
+                    description TEXT,
+                    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+
+            for version, description, steps in MIGRATIONS:
+                if version <= current:
+                    continue
+                logger.info(f"Applying migration {version}: {description}")
+                for step in steps:
+                    if callable(step):
+                        step(cursor)
+                    else:
+                        cursor.execute(step)
+                cursor.execute(
+                    "INSERT INTO schema_migrations (version, description) VALUES (%s, %s)",
+                    (version, description)
+                )
+                current = version
+
+            conn.commit()
+            logger.info(f"Schema migrated to version {current}")
+            return current
+
+
+if __name__ == "__main__":
+    from database import bootstrap_database
+
+    logging.basicConfig(level=logging.INFO)
+    if not bootstrap_database():
+        raise SystemExit("❌ Database bootstrap failed")
+    print(f"✅ Database schema at version {LATEST_VERSION}")
@@ -0,0 +1,111 @@
+"""
+Monthly range partitions and retention for the append-only log tables
+
+user_activity_log and system_analytics are partitioned by month on their
+timestamp column (partitions are named <table>_pYYYY_MM, plus a <table>_default
+catch-all). ensure_partitions() creates the partitions for the coming months
+and apply_retention() drops (or detaches, to archive) partitions that fall
+entirely before the retention cutoff, so old data never has to be DELETEd or
+vacuumed row by row.
+"""
+
+import logging
+import re
+from datetime import date
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Partitioned table -> range key column
+PARTITIONED_TABLES: Dict[str, str] = {
+    'user_activity_log': 'created_at',
+    'system_analytics': 'recorded_at',
+}
+
+RETENTION_ACTIONS = ('drop', 'detach')
+
+
+def month_start(day: date) -> date:
+    """First day of the month containing day"""
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    """Shift a first-of-month date by a number of months"""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    """('user_activity_log', 2024-03-01) -> 'user_activity_log_p2024_03'"""
+    return f"{table}_p{month:%Y_%m}"
+
+
+def partition_month(table: str, name: str) -> Optional[date]:
+    """Month covered by a partition name, or None for the default/foreign partitions"""
+    match = re.fullmatch(re.escape(table) + r'_p(\d{4})_(\d{2})', name)
+    if not match:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+def expired_partitions(table: str, names: List[str], keep_months: int, today: date) -> List[str]:
+    """Partitions whose whole month is older than the last keep_months months (0 keeps everything)"""
+    if keep_months <= 0:
+        return []
+    cutoff = add_months(month_start(today), -(keep_months - 1))
+    months = {name: partition_month(table, name) for name in names}
+    return sorted(name for name, month in months.items() if month is not None and month < cutoff)
+
+
+def ensure_partitions(cursor, months_ahead: int = 2, today: date = None):
+    """Create monthly partitions from the current month through months_ahead months from now"""
+    first = month_start(today or date.today())
+    for table, column in PARTITIONED_TABLES.items():
+        for offset in range(months_ahead + 1):
+            cursor.execute("SELECT ensure_monthly_partition(%s, %s, %s)",
+                           (table, column, add_months(first, offset)))
+
+
+def list_partitions(cursor, table: str) -> List[str]:
+    """Names of the partitions currently attached to a table"""
+    cursor.execute("""
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE parent.relname = %s
+    """, (table,))
+    return [row[0] for row in cursor.fetchall()]
+
+
+def apply_retention(cursor, table: str, keep_months: int, action: str = 'drop', today: date = None) -> List[str]:
+    """Drop or detach the expired partitions of a table and return their names"""
+    if action not in RETENTION_ACTIONS:
+        raise ValueError(f"Unknown retention action '{action}' (expected one of {', '.join(RETENTION_ACTIONS)})")
+    expired = expired_partitions(table, list_partitions(cursor, table), keep_months, today or date.today())
+    for name in expired:
+        # Names come from partition_month() matches, so they are safe identifiers
+        if action == 'detach':
+            cursor.execute(f'ALTER TABLE {table} DETACH PARTITION "{name}"')
+        else:
+            cursor.execute(f'DROP TABLE "{name}"')
+        logger.info(f"Retention: {action} partition {name}")
+    return expired
+
+
+def prune_notifications(cursor, keep_per_user: int, max_age_days: int) -> int:
+    """Delete each user's notifications beyond the newest keep_per_user, and read ones older than max_age_days"""
+    cursor.execute("""
+        DELETE FROM notifications n
+        USING (
+            SELECT id, is_read, created_at,
+                   ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY created_at DESC, id DESC) AS position
+            FROM notifications
+        ) ranked
+        WHERE n.id = ranked.id
+          AND ((%(keep)s > 0 AND ranked.position > %(keep)s)
+               OR (%(days)s > 0 AND ranked.is_read
+                   AND ranked.created_at < NOW() - make_interval(days => %(days)s)))
+    """, {'keep': keep_per_user, 'days': max_age_days})
+    return cursor.rowcount
@@ -0,0 +1,54 @@
+"""
+Connection-level typecasters that decode PostgreSQL values straight into
+JSON-ready Python values
+
+NUMERIC becomes float and timestamp/date/time columns stay ISO 8601 strings
+(PostgreSQL's text output only needs the date/time separator swapped). The
+casters run inside psycopg2 while rows are fetched, so callers never have to
+loop over result rows converting Decimal or datetime values.
+"""
+
+import re
+from typing import Optional
+
+# Built-in type OIDs (pg_type.oid) and their array types
+NUMERIC_OIDS = (1700,)
+NUMERIC_ARRAY_OIDS = (1231,)
+TIMESTAMP_OIDS = (1114, 1184)         # timestamp, timestamptz
+TIMESTAMP_ARRAY_OIDS = (1115, 1185)
+DATE_TIME_OIDS = (1082, 1083, 1266)   # date, time, timetz
+DATE_TIME_ARRAY_OIDS = (1182, 1183, 1270)
+
+_SHORT_OFFSET = re.compile(r'([+-]\d{2})$')
+
+
+def cast_numeric(value: Optional[str], cursor=None) -> Optional[float]:
+    """'12.50' -> 12.5"""
+    return None if value is None else float(value)
+
+
+def cast_timestamp(value: Optional[str], cursor=None) -> Optional[str]:
+    """'2024-03-01 08:30:00.25+08' -> '2024-03-01T08:30:00.25+08:00'"""
+    if value is None:
+        return None
+    return _SHORT_OFFSET.sub(r'\1:00', value.replace(' ', 'T', 1))
+
+
+def cast_text(value: Optional[str], cursor=None) -> Optional[str]:
+    """Dates and times are already ISO formatted"""
+    return value
+
+
+def register_typecasters(conn):
+    """Install the casters on one connection (psycopg2 keeps them per connection)"""
+    from psycopg2.extensions import new_array_type, new_type, register_type
+
+    for name, oids, array_oids, caster in (
+        ('JSON_NUMERIC', NUMERIC_OIDS, NUMERIC_ARRAY_OIDS, cast_numeric),
+        ('JSON_TIMESTAMP', TIMESTAMP_OIDS, TIMESTAMP_ARRAY_OIDS, cast_timestamp),
+        ('JSON_DATETIME', DATE_TIME_OIDS, DATE_TIME_ARRAY_OIDS, cast_text),
+    ):
+        scalar = new_type(oids, name, caster)
+        register_type(scalar, conn)
+        register_type(new_array_type(array_oids, f'{name}_ARRAY', scalar), conn)
+    return conn
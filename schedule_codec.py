@@ -0,0 +1,167 @@
+"""
+Columnar "compact" wire format for schedules
+
+Every schedule row repeats section, subject, teacher and room strings. The
+compact form sends each distinct value once in a lookup table and the rows as
+parallel integer columns (table indexes, day index, start slot, duration):
+
+    {"format": "compact-v1", "count": 2,
+     "days": ["Mon", ...], "first_slot_hour": 7, "slot_minutes": 30,
+     "tables": {"sections": [...], "subjects": [[code, name], ...], "types": [...],
+                "teachers": [...], "rooms": [...]},
+     "columns": {"section": [0, 0], "subject": [3, 1], "type": [0, 1], "teacher": [2, 2],
+                 "room": [1, 4], "day": [0, 2], "start": [4, 10], "duration": [3, 2]}}
+
+Clients opt in with ?format=compact or an Accept header naming COMPACT_MEDIA_TYPE.
+static/schedule_codec.js decodes it back to the regular row objects. Schedules
+whose rows carry extra keys or labels off the slot grid are sent unchanged, so
+the decoding is always lossless.
+
+The same encoding is how saved schedules are stored (schedule_blobs, one row per
+distinct content hash); encode_for_storage() records which encoding a blob uses.
+Later versions of a schedule may instead be stored as a delta against a full
+blob (schedule_versions.py).
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from schedule_utils import DAY_LABELS, FIRST_SLOT_HOUR, slot_index, slot_label
+
+COMPACT_FORMAT = 'compact-v1'
+COMPACT_MEDIA_TYPE = 'application/vnd.intellisched.compact+json'
+# schedule_blobs.encoding values: compact columns, or the verbatim entry list
+STORAGE_COMPACT = COMPACT_FORMAT
+STORAGE_JSON = 'json'
+STORAGE_DELTA = 'delta-v1'
+
+# entry key -> (column name, lookup table name); subjects are keyed on (code, name)
+DICTIONARY_FIELDS = (
+    ('section_id', 'section', 'sections'),
+    ('type', 'type', 'types'),
+    ('teacher_name', 'teacher', 'teachers'),
+    ('room_id', 'room', 'rooms'),
+)
+ENTRY_KEYS = frozenset({
+    'section_id', 'subject_code', 'subject_name', 'type', 'teacher_name', 'room_id',
+    'day', 'start_time_slot', 'duration_slots',
+})
+
+
+def wants_compact(format_param: Optional[str], accept: Optional[str]) -> bool:
+    """Whether the client asked for the compact format (query parameter wins)"""
+    if format_param:
+        return format_param.strip().lower() == 'compact'
+    return COMPACT_MEDIA_TYPE in (accept or '')
+
+
+def _lookup(table: List[Any], index: Dict[Any, int], value: Any) -> int:
+    position = index.get(value)
+    if position is None:
+        position = index[value] = len(table)
+        table.append(value)
+    return position
+
+
+def encode_entries(entries: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Columnar encoding of schedule rows; None when a row cannot round-trip exactly"""
+    tables = {'sections': [], 'subjects': [], 'types': [], 'teachers': [], 'rooms': []}
+    indexes = {name: {} for name in tables}
+    columns = {name: [] for name in ('section', 'subject', 'type', 'teacher', 'room', 'day', 'start', 'duration')}
+
+    # Only labels that map back to themselves exactly; each distinct label is parsed once
+    day_codes = {label: day for day, label in enumerate(DAY_LABELS)}
+    slot_codes = {}
+
+    for entry in entries:
+        if not isinstance(entry, dict) or entry.keys() != ENTRY_KEYS:
+            return None
+        day, label, duration = entry['day'], entry['start_time_slot'], entry['duration_slots']
+        if not isinstance(day, str) or not isinstance(label, str):
+            return None
+        day = day_codes.get(day)
+        if label not in slot_codes:
+            start = slot_index(label)
+            slot_codes[label] = start if start is not None and slot_label(start) == label else None
+        start = slot_codes[label]
+        if day is None or start is None or not isinstance(duration, int) or isinstance(duration, bool):
+            return None
+
+        for key, column, table in DICTIONARY_FIELDS:
+            columns[column].append(_lookup(tables[table], indexes[table], entry[key]))
+        subject = (entry['subject_code'], entry['subject_name'])
+        position = indexes['subjects'].get(subject)
+        if position is None:
+            position = indexes['subjects'][subject] = len(tables['subjects'])
+            tables['subjects'].append(list(subject))
+        columns['subject'].append(position)
+        columns['day'].append(day)
+        columns['start'].append(start)
+        columns['duration'].append(duration)
+
+    return {
+        'format': COMPACT_FORMAT,
+        'count': len(entries),
+        'days': DAY_LABELS,
+        'first_slot_hour': FIRST_SLOT_HOUR,
+        'slot_minutes': 30,
+        'tables': tables,
+        'columns': columns,
+    }
+
+
+def decode_entries(compact: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Inverse of encode_entries (mirrors decodeCompactSchedule in schedule_codec.js)"""
+    tables, columns = compact['tables'], compact['columns']
+    days = compact['days']
+    entries = []
+    for i in range(compact['count']):
+        code, name = tables['subjects'][columns['subject'][i]]
+        entries.append({
+            'section_id': tables['sections'][columns['section'][i]],
+            'subject_code': code,
+            'subject_name': name,
+            'type': tables['types'][columns['type'][i]],
+            'teacher_name': tables['teachers'][columns['teacher'][i]],
+            'room_id': tables['rooms'][columns['room'][i]],
+            'day': days[columns['day'][i]],
+            'start_time_slot': slot_label(columns['start'][i]),
+            'duration_slots': columns['duration'][i],
+        })
+    return entries
+
+
+def compact_payload(content: Any) -> Any:
+    """Compact a bare schedule list or the 'schedule' of a response dict; anything else is returned as-is"""
+    if isinstance(content, list):
+        return encode_entries(content) or content
+    if isinstance(content, dict) and isinstance(content.get('schedule'), list):
+        compact = encode_entries(content['schedule'])
+        if compact is not None:
+            return {**content, 'schedule': compact}
+    return content
+
+
+def encode_for_storage(entries: List[Dict[str, Any]]) -> Tuple[str, Any]:
+    """(encoding, blob) for schedule_blobs: compact when lossless, else the entries as-is"""
+    compact = encode_entries(entries)
+    if compact is None:
+        return STORAGE_JSON, entries
+    return STORAGE_COMPACT, compact
+
+
+def decode_from_storage(encoding: Optional[str], blob: Any,
+                        base: Optional[List[Dict[str, Any]]] = None) -> List[Dict[str, Any]]:
+    """Entry list of a stored blob (legacy inline schedule_data is STORAGE_JSON).
+
+    base is the decoded entry list of the blob a STORAGE_DELTA blob was made against.
+    """
+    if encoding == STORAGE_DELTA:
+        from schedule_versions import apply_delta
+        if base is None:
+            raise ValueError("Delta-encoded schedule blob without its base")
+        return apply_delta(base, blob)
+    if encoding == STORAGE_COMPACT:
+        return decode_entries(blob)
+    if encoding in (None, STORAGE_JSON):
+        return blob or []
+    raise ValueError(f"Unknown schedule storage encoding: {encoding}")
@@ -0,0 +1,122 @@
+"""
+Helpers for working with generated/saved schedule entry lists
+"""
+
+import hashlib
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+# Day labels and slot grid used by the scheduler: 30-minute slots from 07:00
+DAY_LABELS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat"]
+FIRST_SLOT_HOUR = 7
+
+
+def schedule_entries(schedule_data: Any) -> List[Dict[str, Any]]:
+    """Return the list of entries from either a bare list or a generator result dict"""
+    if isinstance(schedule_data, (str, bytes)):
+        schedule_data = json.loads(schedule_data)
+    if isinstance(schedule_data, dict):
+        schedule_data = schedule_data.get('schedule') or []
+    return schedule_data or []
+
+
+def schedule_content_hash(schedule_data: Any) -> str:
+    """Stable SHA-256 of the schedule entries (independent of key order)"""
+    canonical = json.dumps(schedule_entries(schedule_data), sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def schedule_summary(schedule_data: Any) -> Dict[str, Any]:
+    """Summary columns stored alongside a saved schedule"""
+    entries = schedule_entries(schedule_data)
+    return {
+        'entry_count': len(entries),
+        'section_count': len({e.get('section_id') for e in entries if e.get('section_id')}),
+        'teacher_count': len({e.get('teacher_name') for e in entries if e.get('teacher_name')}),
+        'content_hash': schedule_content_hash(entries),
+    }
+
+
+def day_index(day: Any) -> Optional[int]:
+    """Map a day label ('Mon') to its index (0 = Monday); None when unknown"""
+    try:
+        return DAY_LABELS.index(str(day).strip()[:3].title())
+    except ValueError:
+        return None
+
+
+def slot_index(time_slot: Any, round_up: bool = False) -> Optional[int]:
+    """Map a slot label ('07:30-08:00' or '07:30') to its index on the 30-minute grid.
+
+    Times between grid points round down, or up with round_up=True (for the
+    exclusive end of a time window: '09:15' -> 5, so the 09:00 slot is included).
+    """
+    try:
+        hours, minutes = str(time_slot).split('-')[0].strip().split(':')[:2]
+        minutes = (int(hours) - FIRST_SLOT_HOUR) * 60 + int(minutes)
+        slot = -(-minutes // 30) if round_up else minutes // 30
+    except (ValueError, AttributeError):
+        return None
+    return slot if minutes >= 0 else None
+
+
+def slot_label(slot: int) -> str:
+    """Inverse of slot_index: 5 -> '09:30-10:00'"""
+    start = FIRST_SLOT_HOUR * 60 + slot * 30
+    end = start + 30
+    return f"{start // 60:02d}:{start % 60:02d}-{end // 60:02d}:{end % 60:02d}"
+
+
+def schedule_entry_rows(schedule_id: str, schedule_data: Any) -> List[Tuple]:
+    """Flatten schedule entries into schedule_entries rows (entries without a valid day/slot are skipped)"""
+    rows = []
+    for index, entry in enumerate(schedule_entries(schedule_data)):
+        day = day_index(entry.get('day'))
+        start = slot_index(entry.get('start_time_slot'))
+        if day is None or start is None:
+            continue
+        rows.append((
+            schedule_id,
+            index,
+            entry.get('section_id'),
+            entry.get('subject_code'),
+            entry.get('subject_name'),
+            entry.get('type'),
+            entry.get('teacher_name'),
+            entry.get('room_id'),
+            day,
+            start,
+            int(entry.get('duration_slots') or 1),
+        ))
+    return rows
+
+
+def write_schedule_entries(cursor, schedule_id: str, schedule_data: Any) -> int:
+    """Replace the normalized schedule_entries rows of one schedule using the given cursor.
+
+    Teacher and room names from the entries are resolved to their ids in the
+    same statement; the names are kept as well so entries survive renames.
+    """
+    from psycopg2.extras import execute_values
+
+    cursor.execute("DELETE FROM schedule_entries WHERE schedule_id = %s", (schedule_id,))
+    rows = schedule_entry_rows(schedule_id, schedule_data)
+    if not rows:
+        return 0
+    execute_values(cursor, """
+        INSERT INTO schedule_entries (schedule_id, entry_index, section_id, subject_code, subject_name, entry_type,
+                                      teacher_id, teacher_name, room_id, room_name, day, start_slot, duration_slots)
+        SELECT v.schedule_id, v.entry_index, v.section_id, v.subject_code, v.subject_name, v.entry_type,
+               t.teacher_id, v.teacher_name, r.room_id, v.room_name, v.day, v.start_slot, v.duration_slots
+        FROM (VALUES %s) AS v(schedule_id, entry_index, section_id, subject_code, subject_name, entry_type,
+                              teacher_name, room_name, day, start_slot, duration_slots)
+        LEFT JOIN LATERAL (
+            SELECT teacher_id FROM teachers WHERE teacher_name = v.teacher_name ORDER BY id LIMIT 1
+        ) t ON TRUE
+        LEFT JOIN LATERAL (
+            SELECT room_id FROM rooms WHERE room_name = v.room_name OR room_id = v.room_name
+            ORDER BY (room_name = v.room_name) DESC, id LIMIT 1
+        ) r ON TRUE
+    """, rows, template="(%s, %s::int, %s, %s, %s, %s, %s, %s, %s::smallint, %s::smallint, %s::smallint)",
+        page_size=1000)
+    return len(rows)
@@ -0,0 +1,104 @@
+"""
+Schedule versions: meeting keys, diffs and delta encoding
+
+A meeting is identified across versions of a schedule by
+(section_id, subject_code, type, meeting_index), where meeting_index numbers
+the repeated meetings of one section/subject/type in list order. Keys are
+hashed into dicts, so diffing two versions is O(n).
+
+A new version of a schedule is stored as a delta against the full blob of its
+lineage (see save_schedule_to_db): a list of ops that either copy a run of
+unchanged base entries ([base start, length]) or carry a literal entry, which
+reproduces the new list exactly, order included. Here entry 120 changed:
+
+    {"format": "delta-v1", "count": 312, "ops": [[0, 120], {...entry...}, [121, 191]]}
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+DELTA_FORMAT = 'delta-v1'
+# Versions that share fewer entries than this with the base are stored in full
+MAX_LITERAL_RATIO = 0.5
+
+KEY_FIELDS = ('section_id', 'subject_code', 'type')
+# A meeting whose placement changes counts as moved
+PLACEMENT_FIELDS = ('day', 'start_time_slot', 'duration_slots', 'room_id', 'teacher_name')
+
+MeetingKey = Tuple[Any, Any, Any, int]
+
+
+def meeting_keys(entries: List[Dict[str, Any]]) -> List[MeetingKey]:
+    """Key of each entry, in list order"""
+    seen: Dict[Tuple, int] = {}
+    keys = []
+    for entry in entries:
+        base = tuple(entry.get(field) for field in KEY_FIELDS)
+        index = seen.get(base, 0)
+        seen[base] = index + 1
+        keys.append(base + (index,))
+    return keys
+
+
+def key_dict(key: MeetingKey) -> Dict[str, Any]:
+    return dict(zip(KEY_FIELDS + ('meeting_index',), key))
+
+
+def diff_schedules(old: List[Dict[str, Any]], new: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Added, removed and moved meetings between two versions"""
+    old_by_key = dict(zip(meeting_keys(old), old))
+    added, moved = [], []
+    unchanged = 0
+    for key, entry in zip(meeting_keys(new), new):
+        before = old_by_key.pop(key, None)
+        if before is None:
+            added.append(entry)
+        elif before == entry:
+            unchanged += 1
+        else:
+            fields = sorted(set(before) | set(entry))
+            moved.append({
+                'key': key_dict(key),
+                'from': before,
+                'to': entry,
+                'changes': [f for f in fields if before.get(f) != entry.get(f)],
+                'placement_changed': any(before.get(f) != entry.get(f) for f in PLACEMENT_FIELDS),
+            })
+    return {
+        'added': added,
+        'removed': list(old_by_key.values()),
+        'moved': moved,
+        'unchanged': unchanged,
+    }
+
+
+def make_delta(base: List[Dict[str, Any]], entries: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Delta that rebuilds entries from base; None when storing entries in full is better"""
+    base_index = {key: i for i, key in enumerate(meeting_keys(base))}
+    ops: List[Any] = []
+    literals = 0
+    for key, entry in zip(meeting_keys(entries), entries):
+        i = base_index.get(key)
+        if i is not None and base[i] == entry:
+            last = ops[-1] if ops else None
+            if isinstance(last, list) and last[0] + last[1] == i:
+                last[1] += 1
+            else:
+                ops.append([i, 1])
+        else:
+            ops.append(entry)
+            literals += 1
+    if not entries or literals > len(entries) * MAX_LITERAL_RATIO:
+        return None
+    return {'format': DELTA_FORMAT, 'count': len(entries), 'ops': ops}
+
+
+def apply_delta(base: List[Dict[str, Any]], delta: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Inverse of make_delta"""
+    entries: List[Dict[str, Any]] = []
+    for op in delta['ops']:
+        if isinstance(op, list):
+            start, length = op
+            entries.extend(base[start:start + length])
+        else:
+            entries.append(op)
+    return entries
@@ -1,9 +1,11 @@
-from ortools.sat.python import cp_model
-from database import load_subjects_from_db, load_teachers_from_db, load_rooms_from_db
+from availability import SLOTS_PER_DAY, blocked_ranges, free_ranges, parse_windows, teacher_mask
 import gc
 import sys
 
-def generate_schedule(subjects_data, teachers_data, rooms_data, semester_filter, program_sections, programs=['CS'], allow_fallback=True):
+def generate_schedule(subjects_data, teachers_data, rooms_data, semester_filter, program_sections, programs=['CS'], allow_fallback=True, qualifications=None):
+    # Imported here so that importing the app does not load OR-Tools
+    from ortools.sat.python import cp_model
+
     logs = []
     missing_teacher_assignments = []
     print('Scheduler: Initializing model...')
@@ -18,16 +20,19 @@ def generate_schedule(subjects_data, teachers_data, rooms_data, semester_filter,
         teacher_id = t.get('teacher_id')
         teacher_name = t.get('teacher_name')
         if teacher_id and teacher_name:
-            # Handle availability_days - default to all days if not specified
-            availability_days = t.get('availability_days', ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat'])
-            if not availability_days:  # Handle empty/null availability
-                availability_days = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat']
-            
+            try:
+                availability_windows = parse_windows(t.get('availability_windows'))
+            except ValueError as e:
+                print(f"Warning: Ignoring availability windows of teacher {teacher_id}: {e}")
+                availability_windows = []
             cleaned_teachers_data.append({
                 'teacher_id': teacher_id,  # Keep as integer
                 'teacher_name': teacher_name.strip(),
                 'can_teach': str(t.get('can_teach', '' )).replace(' ', ''), # Ensure it's a string before replace
-                'availability_days': availability_days
+                # Day x window bitmask; rows without one fall back to availability_days (empty = all days)
+                'availability_mask': teacher_mask(t),
+                # Explicit (day, start_slot, end_slot) windows refining the mask
+                'availability_windows': availability_windows
             })
         else:
             print(f"Warning: Skipping teacher row due to missing ID or name: {t}")
@@ -43,6 +48,29 @@ def generate_schedule(subjects_data, teachers_data, rooms_data, semester_filter,
     teacher_ids = [t['teacher_id'] for t in cleaned_teachers_data]
     teacher_id_to_name = {t['teacher_id']: t['teacher_name'] for t in cleaned_teachers_data}
 
+    # Subject code -> qualified teacher ids, built once (from teacher_qualifications
+    # when provided, otherwise from can_teach) and kept in teacher list order
+    if qualifications is None:
+        qualifications = {}
+        for t in cleaned_teachers_data:
+            for code in t['can_teach'].split(','):
+                if code:
+                    qualifications.setdefault(code, []).append(t['teacher_id'])
+    teacher_order = {tid: i for i, tid in enumerate(teacher_ids)}
+
+    # Days on which each teacher has at least one available slot
+    teacher_days = {
+        t['teacher_id']: [
+            d for d in range(len(day_labels))
+            if free_ranges(t['availability_mask'], t['availability_windows'], d)
+        ]
+        for t in cleaned_teachers_data
+    }
+    qualified_teachers = {
+        code: sorted((tid for tid in set(tids) if tid in teacher_order), key=teacher_order.get)
+        for code, tids in qualifications.items()
+    }
+
     room_map = {r['room_id']: r for r in rooms_data}
     room_ids = [r['room_id'] for r in rooms_data]
     room_names = [r['room_name'] for r in rooms_data]
@@ -160,10 +188,7 @@ def generate_schedule(subjects_data, teachers_data, rooms_data, semester_filter,
             lab_hours = safe_float(subj.get('lab_hours_per_week', 0))
             is_lab_subject = (lab_hours > 0)
 
-            valid_teachers_for_subj = [
-                t['teacher_id'] for t in cleaned_teachers_data 
-                if subject_code in t['can_teach'].split(',')
-            ]
+            valid_teachers_for_subj = qualified_teachers.get(subject_code, [])
             # Prepare room lists for lecture vs lab components with special constraints
             lecture_rooms_for_subj = [
                 r['room_id'] for r in rooms_data
@@ -341,43 +366,21 @@ def generate_schedule(subjects_data, teachers_data, rooms_data, semester_filter,
             print(f"Debug: Section {event['section_id']} ({event['subject_code']}) has {len(event['valid_teachers'])} valid teachers.")
 
         teacher_var = model.NewIntVarFromDomain(
-            cp_model.Domain.FromValues([teacher_ids.index(tid) for tid in event['valid_teachers']]),
+            cp_model.Domain.FromValues([teacher_order[tid] for tid in event['valid_teachers']]),
             f'teacher_{i}'
         )
         assigned_teachers_vars.append(teacher_var)
         
-        # Add teacher availability day constraints
-        # For each valid teacher, ensure they are only assigned to days they're available
-        for teacher_idx, teacher_id in enumerate(event['valid_teachers']):
-            teacher_data = teacher_map.get(teacher_id)
-            if teacher_data and 'availability_days' in teacher_data:
-                teacher_available_days = teacher_data['availability_days']
-                teacher_name = teacher_data.get('teacher_name', 'Unknown')
-                
-                
-                # Create a boolean variable for this teacher being selected
-                # The teacher_var represents the index in valid_teachers, teacher_idx is the current teacher's position
-                teacher_selected = model.NewBoolVar(f'teacher_selected_{i}_{teacher_idx}')
-                teacher_domain_values = [teacher_ids.index(tid) for tid in event['valid_teachers']]
-                global_teacher_index = teacher_ids.index(teacher_id)
-                teacher_selected_value = teacher_domain_values[teacher_idx]
-                model.Add(teacher_var == teacher_selected_value).OnlyEnforceIf(teacher_selected)
-                model.Add(teacher_var != teacher_selected_value).OnlyEnforceIf(teacher_selected.Not())
-                
-                # For each day, if this teacher is selected, ensure the day is in their availability
-                # For each day, if this teacher is selected, ensure the day is in their availability
-                for day_idx, day_label in enumerate(day_labels):
-                    if day_label not in teacher_available_days:
-                        
-                        # Create boolean variable for day assignment
-                        day_assigned = model.NewBoolVar(f'day_assigned_{i}_{day_idx}')
-                        model.Add(assigned_days[i] == day_idx).OnlyEnforceIf(day_assigned)
-                        model.Add(assigned_days[i] != day_idx).OnlyEnforceIf(day_assigned.Not())
-                        
-                        # If teacher is selected, they cannot be assigned to unavailable days
-                        # This means: NOT(teacher_selected AND day_assigned) when day is not available
-                        # Which is equivalent to: NOT(teacher_selected) OR NOT(day_assigned)
-                        model.AddBoolOr([teacher_selected.Not(), day_assigned.Not()])
+        # Teacher availability: restrict (teacher, day) combinations with one table
+        # constraint. Partially available days are handled by blocked intervals in
+        # each teacher's no-overlap constraint below.
+        allowed_days = [
+            (teacher_order[tid], d)
+            for tid in event['valid_teachers']
+            for d in teacher_days[tid]
+        ]
+        if len(allowed_days) < len(event['valid_teachers']) * len(day_labels):
+            model.AddAllowedAssignments([teacher_var, day_var], allowed_days)
 
         # Ensure valid_rooms is not empty before creating domain
         if not event['valid_rooms']:
@@ -425,25 +428,40 @@ def generate_schedule(subjects_data, teachers_data, rooms_data, semester_filter,
             model.Add(assigned_rooms_vars[i] == preferred_room_index).OnlyEnforceIf(room_preference)
             model.Add(assigned_rooms_vars[i] != preferred_room_index).OnlyEnforceIf(room_preference.Not())
 
-    # Pairwise no-overlap for teachers on the same day
-    for i in range(len(meeting_events)):
-        for j in range(i + 1, len(meeting_events)):
-            # Same teacher indicator (consistent with equality)
-            same_teacher = model.NewBoolVar(f'same_teacher_{i}_{j}')
-            model.Add(assigned_teachers_vars[i] == assigned_teachers_vars[j]).OnlyEnforceIf(same_teacher)
-            model.Add(assigned_teachers_vars[i] != assigned_teachers_vars[j]).OnlyEnforceIf(same_teacher.Not())
-
-            # Same day indicator
-            same_day = model.NewBoolVar(f'same_day_{i}_{j}')
-            model.Add(assigned_days[i] == assigned_days[j]).OnlyEnforceIf(same_day)
-            model.Add(assigned_days[i] != assigned_days[j]).OnlyEnforceIf(same_day.Not())
-
-            # Time separation disjunction for teacher overlap
-            sep_ij_t = model.NewBoolVar(f'separate_{i}_{j}_t')
-            sep_ji_t = model.NewBoolVar(f'separate_{j}_{i}_t')
-            model.Add(assigned_starts[i] + int(meeting_events[i]['duration_slots']) <= assigned_starts[j]).OnlyEnforceIf(sep_ij_t)
-            model.Add(assigned_starts[j] + int(meeting_events[j]['duration_slots']) <= assigned_starts[i]).OnlyEnforceIf(sep_ji_t)
-            model.AddBoolOr([sep_ij_t, sep_ji_t, same_teacher.Not(), same_day.Not()])
+    # Teacher no-overlap on an absolute week timeline (day * slots per day + start).
+    # Each event contributes an optional interval to every teacher it could get, and
+    # the gaps of partially available days are added as fixed blocked intervals.
+    teacher_intervals = {tid: [] for tid in teacher_ids}
+    for i, event in enumerate(meeting_events):
+        duration = int(event['duration_slots'])
+        week_start = model.NewIntVar(0, len(day_labels) * SLOTS_PER_DAY, f'week_start_{i}')
+        model.Add(week_start == assigned_days[i] * SLOTS_PER_DAY + assigned_starts[i])
+        for tid in event['valid_teachers']:
+            if len(event['valid_teachers']) == 1:
+                teacher_intervals[tid].append(model.NewIntervalVar(
+                    week_start, duration, week_start + duration, f'teacher_{tid}_interval_{i}'
+                ))
+                continue
+            teacher_assigned = model.NewBoolVar(f'teacher_{tid}_assigned_{i}')
+            model.Add(assigned_teachers_vars[i] == teacher_order[tid]).OnlyEnforceIf(teacher_assigned)
+            model.Add(assigned_teachers_vars[i] != teacher_order[tid]).OnlyEnforceIf(teacher_assigned.Not())
+            teacher_intervals[tid].append(model.NewOptionalIntervalVar(
+                week_start, duration, week_start + duration, teacher_assigned, f'teacher_{tid}_interval_{i}'
+            ))
+
+    for tid, intervals in teacher_intervals.items():
+        if not intervals:
+            continue
+        teacher = teacher_map[tid]
+        for d in teacher_days[tid]:
+            for block_start, block_end in blocked_ranges(teacher['availability_mask'], teacher['availability_windows'], d):
+                offset = d * SLOTS_PER_DAY
+                intervals.append(model.NewIntervalVar(
+                    offset + block_start, block_end - block_start, offset + block_end,
+                    f'teacher_{tid}_blocked_{d}_{block_start}'
+                ))
+        if len(intervals) > 1:
+            model.AddNoOverlap(intervals)
 
     # Simple room overlap constraint using AddNoOverlap
     # Get gymnasium room IDs
@@ -548,7 +566,7 @@ def generate_schedule(subjects_data, teachers_data, rooms_data, semester_filter,
 
             teacher_var = assigned_teachers_vars[lecture_event_idx]
             valid_teacher_ids = meeting_events[lecture_event_idx]['valid_teachers']
-            teacher_domain_values = [teacher_ids.index(tid) for tid in valid_teacher_ids]
+            teacher_domain_values = [teacher_order[tid] for tid in valid_teacher_ids]
 
             for teacher_idx, teacher_id in enumerate(valid_teacher_ids):
                 teacher_selected = model.NewBoolVar(f'teacher_selected_pair_{section_id}_{subject_code}_{teacher_idx}')
@@ -556,15 +574,10 @@ def generate_schedule(subjects_data, teachers_data, rooms_data, semester_filter,
                 model.Add(teacher_var == teacher_value).OnlyEnforceIf(teacher_selected)
                 model.Add(teacher_var != teacher_value).OnlyEnforceIf(teacher_selected.Not())
 
-                teacher_data = teacher_map.get(teacher_id, {})
-                teacher_available_days = teacher_data.get('availability_days', day_labels)
-                available_day_pairs = []
-                if all(day in teacher_available_days for day in ['Mon', 'Wed']):
-                    available_day_pairs.append('MW')
-                if all(day in teacher_available_days for day in ['Tue', 'Thu']):
-                    available_day_pairs.append('TTh')
-                if all(day in teacher_available_days for day in ['Fri', 'Sat']):
-                    available_day_pairs.append('FS')
+                available_day_pairs = [
+                    pair for pair, day_idxs in day_group_pairs_indices.items()
+                    if all(d in teacher_days[teacher_id] for d in day_idxs)
+                ]
 
                 pair_vars = []
                 for pair in available_day_pairs:
@@ -592,7 +605,7 @@ def generate_schedule(subjects_data, teachers_data, rooms_data, semester_filter,
 
             teacher_var = assigned_teachers_vars[idx0]
             valid_teacher_ids = meeting_events[idx0]['valid_teachers']
-            teacher_domain_values = [teacher_ids.index(tid) for tid in valid_teacher_ids]
+            teacher_domain_values = [teacher_order[tid] for tid in valid_teacher_ids]
 
             for teacher_idx, teacher_id in enumerate(valid_teacher_ids):
                 teacher_selected = model.NewBoolVar(f'teacher_selected_pair_nonlab_{section_id}_{subject_code}_{teacher_idx}')
@@ -600,16 +613,10 @@ def generate_schedule(subjects_data, teachers_data, rooms_data, semester_filter,
                 model.Add(teacher_var == teacher_value).OnlyEnforceIf(teacher_selected)
                 model.Add(teacher_var != teacher_value).OnlyEnforceIf(teacher_selected.Not())
 
-                teacher_data = teacher_map.get(teacher_id, {})
-                teacher_available_days = teacher_data.get('availability_days', day_labels)
-
-                available_day_pairs = []
-                if all(day in teacher_available_days for day in ['Mon', 'Wed']):
-                    available_day_pairs.append('MW')
-                if all(day in teacher_available_days for day in ['Tue', 'Thu']):
-                    available_day_pairs.append('TTh')
-                if all(day in teacher_available_days for day in ['Fri', 'Sat']):
-                    available_day_pairs.append('FS')
+                available_day_pairs = [
+                    pair for pair, day_idxs in day_group_pairs_indices.items()
+                    if all(d in teacher_days[teacher_id] for d in day_idxs)
+                ]
 
                 day_pair_vars = []
                 for pair in available_day_pairs:
@@ -797,7 +804,7 @@ def generate_schedule(subjects_data, teachers_data, rooms_data, semester_filter,
         start_var = model2.NewIntVar(0, len(time_slot_labels) - duration_slots, f'fb_start_{i}')
         day_var = model2.NewIntVar(0, len(day_labels) - 1, f'fb_day_{i}')
         teacher_var = model2.NewIntVarFromDomain(
-            cp_model.Domain.FromValues([teacher_ids.index(tid) for tid in event['valid_teachers']]),
+            cp_model.Domain.FromValues([teacher_order[tid] for tid in event['valid_teachers']]),
             f'fb_teacher_{i}'
         )
         room_var = model2.NewIntVarFromDomain(
@@ -6,7 +6,7 @@ This script sets up the database schema and populates it with initial data
 
 import os
 import sys
-from database import db
+from database import bootstrap_database, db
 
 def setup_database():
     """Set up the database schema and initial data"""
@@ -21,6 +21,9 @@ def setup_database():
         result = db.db.execute_query(test_query)
         print("✅ Database connection successful!")
         
+        # Apply migrations and default users/settings (no longer done on import)
+        bootstrap_database()
+        
         # Create tables (this should already be done by the app)
         print("2. Checking table structure...")
         tables_query = """
@@ -0,0 +1,51 @@
+// Decoder for the columnar "compact-v1" schedule format (see schedule_codec.py).
+// Request it with ?format=compact; payloads that are not compact pass through unchanged.
+
+function slotLabel(slot, firstSlotHour, slotMinutes) {
+  const pad = (n) => String(n).padStart(2, '0');
+  const start = firstSlotHour * 60 + slot * slotMinutes;
+  const end = start + slotMinutes;
+  return `${pad(Math.floor(start / 60))}:${pad(start % 60)}-${pad(Math.floor(end / 60))}:${pad(end % 60)}`;
+}
+
+function decodeCompactSchedule(compact) {
+  const { tables, columns, days, count } = compact;
+  const slotLabels = new Map();
+  const rows = new Array(count);
+  for (let i = 0; i < count; i++) {
+    const start = columns.start[i];
+    if (!slotLabels.has(start)) {
+      slotLabels.set(start, slotLabel(start, compact.first_slot_hour, compact.slot_minutes));
+    }
+    const subject = tables.subjects[columns.subject[i]];
+    rows[i] = {
+      section_id: tables.sections[columns.section[i]],
+      subject_code: subject[0],
+      subject_name: subject[1],
+      type: tables.types[columns.type[i]],
+      teacher_name: tables.teachers[columns.teacher[i]],
+      room_id: tables.rooms[columns.room[i]],
+      day: days[columns.day[i]],
+      start_time_slot: slotLabels.get(start),
+      duration_slots: columns.duration[i]
+    };
+  }
+  return rows;
+}
+
+function isCompactSchedule(value) {
+  return Boolean(value && value.format === 'compact-v1' && value.columns);
+}
+
+// Accepts a bare schedule, a generator result or a saved schedule ({..., schedule: ...})
+function decodeSchedulePayload(payload) {
+  if (isCompactSchedule(payload)) {
+    return decodeCompactSchedule(payload);
+  }
+  if (payload && isCompactSchedule(payload.schedule)) {
+    return { ...payload, schedule: decodeCompactSchedule(payload.schedule) };
+  }
+  return payload;
+}
+
+window.decodeSchedulePayload = decodeSchedulePayload;
@@ -912,7 +912,7 @@ document.getElementById('generateBtn').onclick = async function() {
     const basePayload = { ...requestBody };
     pendingFallbackPayload = null;
 
-    const response = await fetch('/schedule', {
+    const response = await fetch('/schedule?format=compact', {
       method: 'POST',
       headers: getAuthHeaders(),
       body: JSON.stringify({ ...basePayload, allowFallback: false })
@@ -923,7 +923,7 @@ document.getElementById('generateBtn').onclick = async function() {
       throw new Error(errorData.detail || `Schedule generation failed with status ${response.status}`);
     }
 
-    const data = await response.json();
+    const data = decodeSchedulePayload(await response.json());
 
     if (data && data.needs_fallback) {
       const fallbackMessage = data.message || 'Primary solver could not find a feasible schedule with the current constraints.';
@@ -979,13 +979,13 @@ async function runFallbackGeneration() {
     showLoadingState('generateBtn', '<i class="bi bi-arrow-clockwise me-2"></i>Running fallback...');
     showPrimarySolverFailureMessage('Running fallback solver. Please wait...', 'info');
 
-    const response = await fetch('/schedule', {
+    const response = await fetch('/schedule?format=compact', {
       method: 'POST',
       headers: getAuthHeaders(),
       body: JSON.stringify(pendingFallbackPayload)
     });
 
-    const data = await response.json().catch(() => ({}));
+    const data = decodeSchedulePayload(await response.json().catch(() => ({})));
 
     if (!response.ok) {
       const message = data && data.detail ? data.detail : 'Fallback solver request failed.';
@@ -1606,14 +1606,14 @@ async function loadTeachersTable() {
     });
     if (!teachersResponse.ok) throw new Error('Failed to load teachers');
     teachersCache = await teachersResponse.json();
-    renderTable(teachersCache, 'teachersData', ['teacher_id', 'teacher_name', 'can_teach', 'availability_days']);
+    renderTable(teachersCache, 'teachersData', ['teacher_id', 'teacher_name', 'can_teach', 'availability_days', 'availability_windows']);
   } catch (e) {
     console.warn('Could not load teachers:', e);
     document.getElementById('teachersData').innerHTML = '<p>No data available.</p>';
   }
   const tInput = document.getElementById('teachersSearch');
   if (tInput) {
-    tInput.oninput = () => filterTable('teachersData', teachersCache, ['teacher_id', 'teacher_name', 'can_teach', 'availability_days']);
+    tInput.oninput = () => filterTable('teachersData', teachersCache, ['teacher_id', 'teacher_name', 'can_teach', 'availability_days', 'availability_windows']);
   }
 }
 
@@ -1952,6 +1952,7 @@ function promptForData(fields, initial = {}) {
     'teacher_name': 'Professor Name',
     'can_teach': 'Courses (comma-separated)',
     'availability_days': 'Available Days (comma-separated: Mon,Tue,Wed,Thu,Fri,Sat)',
+    'availability_windows': 'Available Hours (optional, e.g. Mon 07:00-12:00, Tue 13:00-17:00)',
     'room_name': 'Room Name',
     'is_laboratory': 'Is Laboratory? (yes/no)',
     'subject_code': 'Course Code',
@@ -2054,7 +2055,7 @@ function setupCrudButtons() {
   const tEdit = document.getElementById('teachersEdit');
   const tDel = document.getElementById('teachersDelete');
   if (tAdd) tAdd.onclick = async () => {
-    const data = promptForData(['teacher_name','can_teach','availability_days']);
+    const data = promptForData(['teacher_name','can_teach','availability_days','availability_windows']);
     if (!data) return;
     // Convert availability_days string to array if provided
     if (data.availability_days && typeof data.availability_days === 'string') {
@@ -2068,9 +2069,9 @@ function setupCrudButtons() {
     loadTeachersTable();
   };
   if (tEdit) tEdit.onclick = async () => {
-    const selected = getSelectedRowData('teachersData', ['teacher_id','teacher_name','can_teach','availability_days']);
+    const selected = getSelectedRowData('teachersData', ['teacher_id','teacher_name','can_teach','availability_days','availability_windows']);
     if (!selected || selected.length === 0) return alert('Select at least one row.');
-    openBulkEditModal('teachers', ['teacher_name','can_teach','availability_days'], selected);
+    openBulkEditModal('teachers', ['teacher_name','can_teach','availability_days','availability_windows'], selected);
   };
   if (tDel) tDel.onclick = async () => {
     const selected = getSelectedRowData('teachersData', ['teacher_id','teacher_name','can_teach']);
@@ -2125,6 +2126,7 @@ function openBulkEditModal(kind, fields, selectedRows) {
     'teacher_name': 'Professor Name',
     'can_teach': 'Courses (comma-separated)',
     'availability_days': 'Available Days (comma-separated: Mon,Tue,Wed,Thu,Fri,Sat)',
+    'availability_windows': 'Available Hours (optional, e.g. Mon 07:00-12:00, Tue 13:00-17:00)',
     'room_name': 'Room Name',
     'is_laboratory': 'Is Laboratory? (yes/no)',
     'subject_code': 'Course Code',
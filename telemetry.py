@@ -0,0 +1,256 @@
+"""
+Write-behind buffer for analytics telemetry
+
+User activity and metric events are queued in memory and written by a
+background thread in batches (multi-row INSERTs), so recording telemetry
+does not cost a database round trip on the request path. A batch is flushed
+when it reaches TELEMETRY_BATCH_SIZE events or TELEMETRY_FLUSH_INTERVAL
+seconds after its first event, and everything pending is flushed on
+shutdown. When the queue is full, producer threads block for up to
+TELEMETRY_BLOCK_TIMEOUT seconds (backpressure) before the event is dropped;
+callers on an asyncio event loop never block and drop the event at once.
+
+Each activity batch also bumps the per-day counters in activity_daily_rollup
+in the same transaction, so the analytics endpoints never scan the raw log.
+Events carry the time they were recorded (not the time of the flush). If a
+batch fails, it is retried row by row so one bad row only loses itself.
+"""
+
+import asyncio
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = int(os.getenv('TELEMETRY_BATCH_SIZE', '200'))
+FLUSH_INTERVAL = float(os.getenv('TELEMETRY_FLUSH_INTERVAL', '1.0'))
+QUEUE_SIZE = int(os.getenv('TELEMETRY_QUEUE_SIZE', '10000'))
+BLOCK_TIMEOUT = float(os.getenv('TELEMETRY_BLOCK_TIMEOUT', '0.5'))
+
+# (table, column list) per event kind; rows are tuples in column order, ending with
+# the (timezone-aware) time the event was recorded
+TABLES = {
+    'activity': ('user_activity_log', ('user_id', 'activity_type', 'activity_description', 'ip_address', 'user_agent',
+                                       'created_at')),
+    'metric': ('system_analytics', ('metric_name', 'metric_value', 'metric_data', 'recorded_at')),
+}
+
+Event = Tuple[str, tuple]
+
+
+def _on_event_loop() -> bool:
+    """Whether the caller runs on an asyncio event loop (where blocking stalls every request)"""
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+# Rows are (created_at, activity_type, user_id, count); events are bucketed by the
+# day they were recorded, in the session time zone like CURRENT_DATE
+ACTIVITY_ROLLUP_SQL = """
+    INSERT INTO activity_daily_rollup (day, activity_type, user_id, activity_count)
+    SELECT v.created_at::timestamptz::date, v.activity_type, v.user_id, SUM(v.activity_count)
+    FROM (VALUES %s) AS v(created_at, activity_type, user_id, activity_count)
+    GROUP BY 1, 2, 3
+    ON CONFLICT (day, activity_type, user_id)
+    DO UPDATE SET activity_count = activity_daily_rollup.activity_count + EXCLUDED.activity_count
+"""
+
+
+class BatchWriter:
+    """Background thread that drains a bounded queue and hands batches to write_batch"""
+
+    def __init__(self, write_batch: Callable[[List[Event]], None], batch_size: int = BATCH_SIZE,
+                 flush_interval: float = FLUSH_INTERVAL, queue_size: int = QUEUE_SIZE,
+                 block_timeout: float = BLOCK_TIMEOUT):
+        self.write_batch = write_batch
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.block_timeout = block_timeout
+        self.queue: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self.written = 0
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='telemetry-writer', daemon=True)
+                    self._thread.start()
+
+    def submit(self, kind: str, row: tuple) -> bool:
+        """Queue one event; returns False if it was dropped.
+
+        A full queue blocks a producer thread for up to block_timeout, but drops the
+        event immediately when called from the event loop.
+        """
+        if self._closed:
+            return False
+        self._ensure_started()
+        try:
+            if _on_event_loop():
+                self.queue.put_nowait((kind, row))
+            else:
+                self.queue.put((kind, row), timeout=self.block_timeout)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            logger.warning(f"Telemetry queue full; dropped {kind} event ({self.dropped} dropped so far)")
+            return False
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Block until every event queued before this call has been written"""
+        if self._thread is None:
+            return True
+        done = threading.Event()
+        self.queue.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout: float = 10.0):
+        """Flush pending events and stop the writer thread"""
+        if self._closed:
+            return
+        self.flush(timeout)
+        self._closed = True
+        if self._thread is not None:
+            self.queue.put(None)
+            self._thread.join(timeout)
+
+    def _write(self, batch: List[Event]):
+        if not batch:
+            return
+        try:
+            self.write_batch(batch)
+            self.written += len(batch)
+        except Exception as e:
+            logger.error(f"Error writing {len(batch)} telemetry events: {e}")
+
+    def _run(self):
+        batch: List[Event] = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                item = False  # flush interval elapsed
+
+            if isinstance(item, tuple):
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+                if len(batch) < self.batch_size:
+                    continue
+            self._write(batch)
+            batch, deadline = [], None
+
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is None:
+                return
+
+
+def group_batch(batch: List[Event]) -> Dict[str, List[tuple]]:
+    """Split a batch into rows per event kind, preserving order"""
+    rows: Dict[str, List[tuple]] = {}
+    for kind, row in batch:
+        rows.setdefault(kind, []).append(row)
+    return rows
+
+
+def activity_rollup_rows(rows: List[tuple]) -> List[Tuple[datetime, str, int, int]]:
+    """Collapse activity rows into (created_at, activity_type, user_id, count) per minute.
+
+    The rollup SQL re-buckets them by local day (UTC offsets are whole minutes);
+    anonymous activity counts as user 0.
+    """
+    counts: Dict[Tuple[datetime, str, int], int] = {}
+    for row in rows:
+        minute = row[5].replace(second=0, microsecond=0)
+        key = (minute, row[1], row[0] or 0)
+        counts[key] = counts.get(key, 0) + 1
+    return [(minute, activity_type, user_id, count) for (minute, activity_type, user_id), count in counts.items()]
+
+
+class TelemetryWriter(BatchWriter):
+    """BatchWriter that inserts activity and metric events through a DatabaseManager"""
+
+    def __init__(self, db_manager, **kwargs):
+        super().__init__(self._insert, **kwargs)
+        self.db_manager = db_manager
+        self.rejected = 0
+
+    def _insert_rows(self, cursor, kind: str, rows: List[tuple]):
+        from psycopg2.extras import execute_values
+
+        table, columns = TABLES[kind]
+        execute_values(
+            cursor,
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES %s",
+            rows,
+            page_size=self.batch_size
+        )
+        if kind == 'activity':
+            execute_values(cursor, ACTIVITY_ROLLUP_SQL, activity_rollup_rows(rows), page_size=self.batch_size)
+
+    def _insert(self, batch: List[Event]):
+        with self.db_manager.get_connection() as conn:
+            with conn.cursor() as cursor:
+                try:
+                    for kind, rows in group_batch(batch).items():
+                        self._insert_rows(cursor, kind, rows)
+                    conn.commit()
+                    return
+                except Exception as e:
+                    conn.rollback()
+                    logger.warning(f"Telemetry batch of {len(batch)} events failed ({e}); retrying row by row")
+
+                # One savepoint per event, so a bad row (malformed INET, deleted user) only loses itself
+                for kind, row in batch:
+                    cursor.execute("SAVEPOINT telemetry_event")
+                    try:
+                        self._insert_rows(cursor, kind, [row])
+                        cursor.execute("RELEASE SAVEPOINT telemetry_event")
+                    except Exception as e:
+                        cursor.execute("ROLLBACK TO SAVEPOINT telemetry_event")
+                        self.rejected += 1
+                        logger.error(f"Dropped invalid {kind} telemetry event {row!r}: {e}")
+            conn.commit()
+
+    def record_activity(self, user_id: int, activity_type: str, description: str,
+                        ip_address: str = None, user_agent: str = None) -> bool:
+        return self.submit('activity', (user_id, activity_type, description, ip_address, user_agent,
+                                        datetime.now(timezone.utc)))
+
+    def record_metric(self, metric_name: str, metric_value: float, metric_data: Dict = None) -> bool:
+        data_json = json.dumps(metric_data) if metric_data else None
+        return self.submit('metric', (metric_name, metric_value, data_json, datetime.now(timezone.utc)))
+
+
+_writers: List[BatchWriter] = []
+
+
+def register(writer: BatchWriter) -> BatchWriter:
+    """Track a writer so shutdown_all() (and interpreter exit) flushes it"""
+    _writers.append(writer)
+    return writer
+
+
+def shutdown_all():
+    """Flush and stop every registered writer"""
+    for writer in _writers:
+        writer.close()
+
+
+atexit.register(shutdown_all)
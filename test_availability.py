@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Test teacher availability bitmask helpers (no database required)
+"""
+
+from availability import (
+    FULL_MASK,
+    blocked_ranges,
+    day_mask,
+    days_from_mask,
+    format_window,
+    is_available,
+    is_full_day,
+    mask_from_days,
+    mask_with_windows,
+    parse_windows,
+    teacher_mask,
+)
+
+def test_mask_from_stored_formats():
+    print("🧪 Testing mask_from_days")
+    expected = day_mask(0) | day_mask(2) | day_mask(4)
+    assert mask_from_days(['Mon', 'Wed', 'Fri']) == expected
+    assert mask_from_days('Mon, Wed ,Fri') == expected
+    assert mask_from_days('{Mon,Wed,Fri}') == expected
+    assert mask_from_days(None) == FULL_MASK and mask_from_days('') == FULL_MASK
+    assert days_from_mask(expected) == ['Mon', 'Wed', 'Fri']
+
+def test_teacher_mask_prefers_stored_mask():
+    print("🧪 Testing teacher_mask")
+    assert teacher_mask({'availability_mask': day_mask(1), 'availability_days': 'Mon'}) == day_mask(1)
+    assert teacher_mask({'availability_days': ['Sat']}) == day_mask(5)
+    assert teacher_mask({}) == FULL_MASK
+
+def test_partial_day_bits():
+    print("🧪 Testing partial-day bits")
+    mornings_only = 1 << (1 * 2)  # Tue AM
+    assert is_available(mornings_only, 1) and not is_full_day(mornings_only, 1)
+    assert not is_available(mornings_only, 0)
+    assert blocked_ranges(mornings_only, [], 1) == [(10, 22)]
+    assert blocked_ranges(mornings_only, [], 0) == []
+    assert blocked_ranges(FULL_MASK, [], 3) == []
+
+def test_explicit_windows_compile_to_blocked_ranges():
+    print("🧪 Testing availability windows")
+    windows = parse_windows('Tue 13:00-17:00; Tue 08:00-09:30, Mon 07:00-18:00')
+    assert windows == [(0, 0, 22), (1, 2, 5), (1, 12, 20)]
+    assert [format_window(w) for w in windows][1] == 'Tue 08:00-09:30'
+    assert blocked_ranges(FULL_MASK, windows, 1) == [(0, 2), (5, 12), (20, 22)]
+    assert blocked_ranges(FULL_MASK, windows, 0) == []
+    # Windows replace the AM/PM bits of the days they cover
+    mask = mask_with_windows(day_mask(5), windows)
+    assert days_from_mask(mask) == ['Mon', 'Tue', 'Sat'] and is_full_day(mask, 1)
+    for bad in ['Tue 12:00-09:00', 'Sun 07:00-09:00', 'Mon morning']:
+        try:
+            parse_windows(bad)
+        except ValueError:
+            continue
+        raise AssertionError(f"Window should have been rejected: {bad}")
+
+if __name__ == "__main__":
+    test_mask_from_stored_formats()
+    test_teacher_mask_prefers_stored_mask()
+    test_partial_day_bits()
+    test_explicit_windows_compile_to_blocked_ranges()
+    print("✅ Availability tests passed!")
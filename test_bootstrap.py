@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Test that a failed schema migration is not remembered as a completed bootstrap
+(no database server required)
+"""
+
+import database
+
+def test_failed_migration_is_retried():
+    print("🧪 Testing bootstrap retries after a failed migration")
+    calls = []
+    def failing_migrations(manager):
+        calls.append('migrate')
+        raise RuntimeError("relation already exists")
+
+    original_migrations = database.apply_migrations
+    original_settings = database.initialize_default_settings
+    database.apply_migrations = failing_migrations
+    database.initialize_default_settings = lambda: calls.append('settings')
+    database._bootstrapped = False
+    try:
+        assert database.db.setup_tables() is False
+        assert database.bootstrap_database() is False
+        assert database._bootstrapped is False
+        assert database.bootstrap_database() is False
+        assert calls == ['migrate', 'migrate', 'migrate']
+    finally:
+        database.apply_migrations = original_migrations
+        database.initialize_default_settings = original_settings
+        database._bootstrapped = False
+
+if __name__ == "__main__":
+    test_failed_migration_is_retried()
+    print("✅ Bootstrap tests passed!")
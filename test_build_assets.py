@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Test the static asset build (fingerprints, precompression, rewritten references)
+"""
+
+import gzip
+import json
+import os
+import tempfile
+
+from build_assets import build, fingerprint, rewrite_references
+
+def _write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+def test_fingerprint_and_rewrite():
+    print("🧪 Testing fingerprint and rewrite_references")
+    assert fingerprint('assets/logo.png', b'x').startswith('assets/logo.')
+    assert fingerprint('a.css', b'x') != fingerprint('a.css', b'y')
+    manifest = {'/static/script.js': '/static/dist/script.abc.js'}
+    html = '<script src="/static/script.js?v=10"></script><img src="/static/other.png">'
+    assert rewrite_references(html, manifest) == '<script src="/static/dist/script.abc.js"></script><img src="/static/other.png">'
+
+def test_build_outputs():
+    print("🧪 Testing build")
+    with tempfile.TemporaryDirectory() as static:
+        _write(os.path.join(static, 'assets', 'logo.png'), 'png')
+        _write(os.path.join(static, 'style.css'), "body { background: url('/static/assets/logo.png'); }" + ' ' * 300)
+        _write(os.path.join(static, 'script.js'), 'console.log("hi");' * 50)
+        _write(os.path.join(static, 'script_backup.js'), 'old')
+        _write(os.path.join(static, 'index.html'), '<link href="/static/style.css"><script src="/static/script.js?v=3"></script>')
+
+        manifest = build(static)
+        assert set(manifest) == {'/static/assets/logo.png', '/static/style.css', '/static/script.js'}
+        with open(os.path.join(static, 'dist', 'manifest.json')) as f:
+            assert json.load(f) == manifest
+
+        css_path = os.path.join(static, manifest['/static/style.css'][len('/static/'):])
+        with open(css_path) as f:
+            assert manifest['/static/assets/logo.png'] in f.read()
+        with gzip.open(css_path + '.gz', 'rt') as f:
+            assert manifest['/static/assets/logo.png'] in f.read()
+
+        with open(os.path.join(static, 'dist', 'pages', 'index.html')) as f:
+            page = f.read()
+        assert manifest['/static/style.css'] in page and manifest['/static/script.js'] in page and '?v=' not in page
+
+if __name__ == "__main__":
+    test_fingerprint_and_rewrite()
+    test_build_outputs()
+    print("✅ Asset build tests passed!")
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Test CSV upload validation and normalization (no database required)
+"""
+
+import asyncio
+
+from csv_ingest import (
+    DATASETS,
+    CsvIngestion,
+    RowError,
+    UploadTooLarge,
+    iter_csv_batches,
+    normalize_curriculum_row,
+    normalize_room_row,
+    normalize_teacher_row,
+    read_csv_rows,
+)
+
+def test_read_csv_rows_normalizes_keys():
+    print("🧪 Testing read_csv_rows")
+    rows = list(read_csv_rows("Subject_Code , Subject_Name\n CS1 , Intro \n"))
+    assert rows == [{'subject_code': 'CS1', 'subject_name': 'Intro'}]
+
+def test_curriculum_row_parsing():
+    print("🧪 Testing curriculum row normalization")
+    record = normalize_curriculum_row({
+        'code': 'CS1', 'name': 'Intro', 'lec_hours': '2.0', 'lab_hours': '', 'units': '3',
+        'semester': '1', 'year': '',
+    })
+    assert record['subject_code'] == 'CS1'
+    assert record['lecture_hours_per_week'] == 2
+    assert record['lab_hours_per_week'] == 0
+    assert record['semester'] == 1
+    assert record['year_level'] is None
+
+def test_curriculum_uploads_are_tagged_with_program():
+    print("🧪 Testing curriculum datasets")
+    for dataset, program in [('cs_curriculum', 'CS'), ('it_curriculum', 'IT')]:
+        spec = DATASETS[dataset]
+        record = spec['normalize']({'subject_code': 'GE1', 'subject_name': 'Purposive Communication'})
+        assert spec['table'] == 'curriculum' and record['program'] == program
+        assert set(spec['key']) <= {name for name, _ in spec['columns']}
+
+def test_invalid_rows_are_rejected():
+    print("🧪 Testing invalid row detection")
+    for row, normalize in [
+        ({'subject_name': 'No code'}, normalize_curriculum_row),
+        ({'subject_code': 'CS1', 'subject_name': 'Intro', 'units': 'three'}, normalize_curriculum_row),
+        ({'can_teach': 'CS1'}, normalize_teacher_row),
+    ]:
+        try:
+            normalize(row)
+        except RowError:
+            continue
+        raise AssertionError(f"Row should have been rejected: {row}")
+
+def test_missing_ids_and_flags():
+    print("🧪 Testing ID-less rows and boolean flags")
+    teacher = normalize_teacher_row({'name': 'Ana Cruz', 'subjects': 'CS1,CS2'})
+    # No random ID: finish() resolves it from the name, so re-uploads do not duplicate
+    assert teacher['teacher_id'] is None and teacher['can_teach'] == 'CS1,CS2'
+    assert normalize_room_row({'room_name': 'Lab 1'})['room_id'] is None
+    assert normalize_teacher_row({'teacher_id': 'T1', 'teacher_name': 'Ana'})['teacher_id'] == 'T1'
+    for dataset in ('teachers', 'rooms'):
+        spec = DATASETS[dataset]
+        assert spec['natural_key'] in {name for name, _ in spec['columns']}
+    assert normalize_room_row({'room_name': 'Lab 1', 'is_laboratory': 'Yes'})['is_laboratory'] is True
+    assert normalize_room_row({'room_name': 'Room 101'})['is_laboratory'] is False
+
+class FakeUpload:
+    """Minimal stand-in for UploadFile.read(size)"""
+    def __init__(self, data: bytes):
+        self.data = data
+        self.pos = 0
+
+    async def read(self, size: int = -1) -> bytes:
+        chunk = self.data[self.pos:self.pos + size]
+        self.pos += len(chunk)
+        return chunk
+
+def collect_batches(data: bytes, **kwargs):
+    async def run():
+        return [batch async for batch in iter_csv_batches(FakeUpload(data), **kwargs)]
+    return asyncio.run(run())
+
+def test_streaming_parser_handles_chunk_boundaries():
+    print("🧪 Testing streaming CSV parser")
+    text = '\ufeffRoom_ID,Room_Name,Notes\r\nR1,Lab 1,"multi\nline, quoted"\r\nR2,Salón 2,\r\nR3,Room 3,last'
+    data = text.encode('utf-8')
+    expected = list(read_csv_rows(text.lstrip('\ufeff')))
+    for chunk_size in (1, 2, 3, 7, 64):
+        batches = collect_batches(data, max_bytes=len(data), chunk_size=chunk_size, batch_size=2)
+        assert [len(b) for b in batches] == [2, 1]
+        assert [row for batch in batches for _, row in batch] == expected
+        assert [line for batch in batches for line, _ in batch] == [2, 4, 5]
+    assert expected[0]['notes'] == 'multi\nline, quoted'
+    assert expected[1]['room_name'] == 'Salón 2'
+
+def test_errors_report_physical_lines():
+    print("🧪 Testing error line numbers")
+    text = ('teacher_id,teacher_name,notes\n'
+            'T1,Ana,"spans\ntwo lines"\n'
+            '\n'
+            'T2,,missing name\n'
+            'T3,Ben,"three\n\nlines"\n'
+            'T4,,again\n')
+    data = text.encode('utf-8')
+    ingestion = CsvIngestion(None, 'teachers')
+    for chunk_size in (5, 4096):
+        ingestion.errors, ingestion.error_count = [], 0
+        for batch in collect_batches(data, max_bytes=len(data), chunk_size=chunk_size, batch_size=2):
+            ingestion.feed(batch)
+        assert [e['line'] for e in ingestion.errors] == [5, 9]
+
+class FailingConnection:
+    """Connection whose first statement fails, as when the database rejects CREATE TEMP TABLE"""
+    def __init__(self):
+        self.closed = False
+        self.rolled_back = False
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql, params=None):
+        raise RuntimeError("permission denied to create temporary tables")
+
+    def rollback(self):
+        self.rolled_back = True
+
+    def close(self):
+        self.closed = True
+
+class FailingManager:
+    def __init__(self):
+        self.conn = FailingConnection()
+
+    def get_connection(self):
+        return self.conn
+
+def test_failed_setup_releases_connection():
+    print("🧪 Testing connection cleanup when staging setup fails")
+    manager = FailingManager()
+    try:
+        with CsvIngestion(manager, 'rooms'):
+            raise AssertionError("setup should have failed")
+    except RuntimeError:
+        pass
+    assert manager.conn.rolled_back and manager.conn.closed
+
+def test_streaming_parser_enforces_size_limit():
+    print("🧪 Testing upload size limit")
+    data = b"room_id,room_name\n" + b"R1,Room\n" * 100
+    try:
+        collect_batches(data, max_bytes=len(data) - 1, chunk_size=16)
+    except UploadTooLarge:
+        return
+    raise AssertionError("Oversized upload should have been rejected")
+
+if __name__ == "__main__":
+    test_read_csv_rows_normalizes_keys()
+    test_curriculum_row_parsing()
+    test_curriculum_uploads_are_tagged_with_program()
+    test_invalid_rows_are_rejected()
+    test_missing_ids_and_flags()
+    test_streaming_parser_handles_chunk_boundaries()
+    test_errors_report_physical_lines()
+    test_failed_setup_releases_connection()
+    test_streaming_parser_enforces_size_limit()
+    print("✅ CSV ingestion tests passed!")
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Test fast JSON serialization and Accept-Encoding negotiation
+"""
+
+import gzip
+import json
+from decimal import Decimal
+
+import fast_json
+from fast_json import choose_encoding, dumps, encode_body, parse_accept_encoding
+
+def test_dumps():
+    print("🧪 Testing dumps")
+    content = {'name': 'Écologie', 'hours': Decimal('1.5'), 'rows': [1, None, True]}
+    assert json.loads(dumps(content)) == {'name': 'Écologie', 'hours': 1.5, 'rows': [1, None, True]}
+    assert dumps([{'a': 1}]) == b'[{"a":1}]'
+
+def test_negotiation():
+    print("🧪 Testing Accept-Encoding negotiation")
+    assert parse_accept_encoding('gzip, br;q=0.5, identity;q=0') == {'gzip': 1.0, 'br': 0.5, 'identity': 0.0}
+    assert choose_encoding(None) is None
+    assert choose_encoding('identity') is None
+    assert choose_encoding('gzip;q=0, deflate') is None
+    assert choose_encoding('gzip, deflate') == 'gzip'
+    expected = 'br' if fast_json.brotli else 'gzip'
+    assert choose_encoding('gzip, deflate, br') == expected
+    assert choose_encoding('*') == expected
+    # Precompressed assets: pick among the files present, honouring q-values and q=0
+    assert choose_encoding('gzip, br', ['br', 'gzip']) == 'br'
+    assert choose_encoding('gzip, br;q=0.5', ['br', 'gzip']) == 'gzip'
+    assert choose_encoding('br;q=0, gzip;q=0', ['br', 'gzip']) is None
+    assert choose_encoding('*;q=0.1, gzip;q=0', ['gzip']) is None
+    assert choose_encoding('gzip', ['br']) is None
+
+def test_encode_body():
+    print("🧪 Testing encode_body threshold")
+    small = dumps({'ok': True})
+    assert encode_body(small, 'gzip') == (small, None)
+    large = dumps([{'subject_name': 'Data Structures and Algorithms', 'day': 'Monday'}] * 200)
+    body, encoding = encode_body(large, 'gzip')
+    assert encoding == 'gzip' and len(body) < len(large) and gzip.decompress(body) == large
+    assert encode_body(large, '') == (large, None)
+
+if __name__ == "__main__":
+    test_dumps()
+    test_negotiation()
+    test_encode_body()
+    print("✅ fast_json tests passed!")
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Test ETag / Last-Modified helpers (no server required)
+"""
+
+from http_cache import coded_etag, etag_matches, is_fresh, make_etag, not_modified_headers, validator_headers
+
+def test_etag_matching():
+    print("🧪 Testing etag_matches")
+    etag = make_etag('teachers', 7)
+    assert etag == make_etag('teachers', 7) and etag != make_etag('teachers', 8)
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches('*', etag)
+    assert not etag_matches('"other"', etag)
+    assert not etag_matches(None, etag)
+
+def test_coded_etags():
+    print("🧪 Testing per-coding ETags")
+    etag = make_etag('schedule', 'abc')
+    gzipped, brotli = coded_etag(etag, 'gzip'), coded_etag(etag, 'br')
+    assert gzipped == etag[:-1] + '-gzip"' and brotli == etag[:-1] + '-br"'
+    assert len({etag, gzipped, brotli}) == 3
+    assert coded_etag(etag, None) == etag
+    # Any representation's tag revalidates any other representation of the same body
+    assert etag_matches(gzipped, etag) and etag_matches(etag, brotli) and etag_matches(f'W/{gzipped}', brotli)
+    assert is_fresh({'if-none-match': gzipped}, etag)
+    assert not etag_matches(coded_etag(make_etag('schedule', 'xyz'), 'gzip'), gzipped)
+
+def test_not_modified_headers():
+    print("🧪 Testing 304 validator headers")
+    etag = make_etag('schedule', 'abc')
+    headers = not_modified_headers(etag, 1700000000, 'gzip')
+    assert headers['ETag'] == coded_etag(etag, 'gzip')
+    assert headers['Vary'] == 'Authorization, Accept-Encoding'
+    assert headers['Last-Modified'] == validator_headers(etag, 1700000000)['Last-Modified']
+    assert not_modified_headers(etag)['ETag'] == etag
+
+def test_conditional_requests():
+    print("🧪 Testing is_fresh and validator_headers")
+    etag = make_etag('rooms', 3)
+    headers = validator_headers(etag, 1700000000)
+    assert headers['ETag'] == etag
+    assert headers['Last-Modified'] == 'Tue, 14 Nov 2023 22:13:20 GMT'
+    assert headers['Cache-Control'] == 'private, no-cache'
+    assert is_fresh({'if-none-match': etag}, etag, 1700000000)
+    # If-None-Match wins over If-Modified-Since
+    assert not is_fresh({'if-none-match': '"stale"', 'if-modified-since': headers['Last-Modified']}, etag, 1700000000)
+    assert is_fresh({'if-modified-since': headers['Last-Modified']}, etag, 1700000000)
+    assert not is_fresh({'if-modified-since': headers['Last-Modified']}, etag, 1700000001)
+    assert not is_fresh({'if-modified-since': 'garbage'}, etag, 1700000000)
+    assert not is_fresh({}, etag, 1700000000)
+
+if __name__ == "__main__":
+    test_etag_matching()
+    test_coded_etags()
+    test_not_modified_headers()
+    test_conditional_requests()
+    print("✅ HTTP cache helper tests passed!")
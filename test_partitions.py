@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Test monthly partition and retention helpers (no database required)
+"""
+
+from datetime import date
+
+from partitions import add_months, apply_retention, expired_partitions, partition_month, partition_name
+
+class FakeCursor:
+    """Records executed statements and answers the partition listing query"""
+
+    def __init__(self, partitions):
+        self.partitions = partitions
+        self.statements = []
+
+    def execute(self, query, params=None):
+        self.statements.append(query.strip())
+
+    def fetchall(self):
+        return [(name,) for name in self.partitions]
+
+def test_month_arithmetic_and_names():
+    print("🧪 Testing month helpers")
+    assert add_months(date(2024, 11, 1), 3) == date(2025, 2, 1)
+    assert add_months(date(2024, 1, 1), -1) == date(2023, 12, 1)
+    assert partition_name('user_activity_log', date(2024, 3, 1)) == 'user_activity_log_p2024_03'
+    assert partition_month('user_activity_log', 'user_activity_log_p2024_03') == date(2024, 3, 1)
+    assert partition_month('user_activity_log', 'user_activity_log_default') is None
+
+def test_expired_partitions_keep_recent_months():
+    print("🧪 Testing expired_partitions")
+    names = ['system_analytics_default'] + [partition_name('system_analytics', date(2024, m, 1)) for m in range(1, 13)]
+    expired = expired_partitions('system_analytics', names, 3, date(2024, 12, 15))
+    assert expired == [partition_name('system_analytics', date(2024, m, 1)) for m in range(1, 10)]
+    assert expired_partitions('system_analytics', names, 0, date(2024, 12, 15)) == []
+
+def test_apply_retention_drops_or_detaches():
+    print("🧪 Testing apply_retention")
+    cursor = FakeCursor(['user_activity_log_p2023_01', 'user_activity_log_p2024_06', 'user_activity_log_default'])
+    assert apply_retention(cursor, 'user_activity_log', 12, 'detach', date(2024, 6, 1)) == ['user_activity_log_p2023_01']
+    assert cursor.statements[-1] == 'ALTER TABLE user_activity_log DETACH PARTITION "user_activity_log_p2023_01"'
+    apply_retention(cursor, 'user_activity_log', 12, 'drop', date(2024, 6, 1))
+    assert cursor.statements[-1] == 'DROP TABLE "user_activity_log_p2023_01"'
+    try:
+        apply_retention(cursor, 'user_activity_log', 12, 'archive')
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+
+if __name__ == "__main__":
+    test_month_arithmetic_and_names()
+    test_expired_partitions_keep_recent_months()
+    test_apply_retention_drops_or_detaches()
+    print("✅ Partition helper tests passed!")
@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""
+Test the JSON-ready PostgreSQL typecasters (no database required)
+"""
+
+from pg_types import cast_numeric, cast_text, cast_timestamp
+
+def test_numeric_becomes_float():
+    print("🧪 Testing cast_numeric")
+    assert cast_numeric('12.50') == 12.5
+    assert cast_numeric(None) is None
+
+def test_timestamps_become_iso_strings():
+    print("🧪 Testing cast_timestamp")
+    assert cast_timestamp('2024-03-01 08:30:00') == '2024-03-01T08:30:00'
+    assert cast_timestamp('2024-03-01 08:30:00.25+08') == '2024-03-01T08:30:00.25+08:00'
+    assert cast_timestamp('2024-03-01 08:30:00-05:30') == '2024-03-01T08:30:00-05:30'
+    assert cast_timestamp(None) is None
+    assert cast_text('2024-03-01') == '2024-03-01'
+
+if __name__ == "__main__":
+    test_numeric_becomes_float()
+    test_timestamps_become_iso_strings()
+    print("✅ Typecaster tests passed!")
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test read-your-writes routing: read-only requests stay on the replicas and
+get no sticky-primary cookie (no database server required)
+"""
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import database
+from app import REPLICA_STICKY_COOKIE, ReplicaStickinessMiddleware
+from database import DatabaseManager
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.rowcount = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params=None):
+        self.conn.log.append((self.conn.url, ' '.join(query.split())[:40]))
+
+    def fetchall(self):
+        return []
+
+class FakeConnection:
+    """Records which URL each statement ran against"""
+    def __init__(self, url, log):
+        self.url = url
+        self.log = log
+        self.closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def cursor(self, cursor_factory=None):
+        return FakeCursor(self)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+def routed_client():
+    log = []
+    manager = DatabaseManager('primary', replica_urls=['replica'])
+    manager._connect = lambda url: FakeConnection(url, log)
+
+    demo = FastAPI()
+    demo.add_middleware(ReplicaStickinessMiddleware)
+
+    @demo.get('/read')
+    def read():
+        # What MaintenanceMiddleware and require_role do on every request
+        database.get_system_setting('maintenance_mode', 'false')
+        database.db.get_user_by_username('chair')
+        database.get_schedule_approval_status('sched-1')
+        database.get_latest_saved_schedule_id(1)
+        return {'ok': True}
+
+    @demo.post('/write')
+    def write():
+        database.db.db.execute_single("UPDATE system_settings SET setting_value = %s", ('x',))
+        return {'ok': True}
+
+    return TestClient(demo), manager, log
+
+def test_read_only_request_gets_no_sticky_cookie():
+    print("🧪 Testing read-only requests stay on the replica")
+    original = database.db.db
+    client, manager, log = routed_client()
+    database.db.db = manager
+    try:
+        response = client.get('/read')
+        assert response.status_code == 200
+        assert REPLICA_STICKY_COOKIE not in response.headers.get('set-cookie', '')
+        assert log and all(url == 'replica' for url, _ in log), log
+
+        log.clear()
+        response = client.post('/write')
+        assert REPLICA_STICKY_COOKIE in response.headers.get('set-cookie', '')
+        assert [url for url, _ in log] == ['primary']
+    finally:
+        database.db.db = original
+
+if __name__ == "__main__":
+    test_read_only_request_gets_no_sticky_cookie()
+    print("✅ Replica routing tests passed!")
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Test the columnar compact schedule format
+"""
+
+from schedule_codec import (
+    COMPACT_MEDIA_TYPE, STORAGE_COMPACT, STORAGE_JSON, compact_payload, decode_entries, decode_from_storage,
+    encode_entries, encode_for_storage, wants_compact,
+)
+
+ENTRIES = [
+    {'section_id': 'CS1A', 'subject_code': 'CS101', 'subject_name': 'Intro to Computing', 'type': 'lecture',
+     'teacher_name': 'Ana Cruz', 'room_id': 'Room 201', 'day': 'Mon', 'start_time_slot': '07:00-07:30', 'duration_slots': 3},
+    {'section_id': 'CS1A', 'subject_code': 'CS101', 'subject_name': 'Intro to Computing', 'type': 'lab',
+     'teacher_name': 'Ana Cruz', 'room_id': 'Lab 1', 'day': 'Wed', 'start_time_slot': '13:30-14:00', 'duration_slots': 6},
+    {'section_id': 'IT2B', 'subject_code': 'IT201', 'subject_name': 'Networking', 'type': 'lecture',
+     'teacher_name': None, 'room_id': 'Room 201', 'day': 'Sat', 'start_time_slot': '09:00-09:30', 'duration_slots': 2},
+]
+
+def test_round_trip():
+    print("🧪 Testing compact encode/decode round trip")
+    compact = encode_entries(ENTRIES)
+    assert compact['count'] == 3
+    assert compact['tables']['subjects'] == [['CS101', 'Intro to Computing'], ['IT201', 'Networking']]
+    assert compact['columns']['teacher'] == [0, 0, 1] and compact['tables']['teachers'] == ['Ana Cruz', None]
+    assert compact['columns']['day'] == [0, 2, 5] and compact['columns']['start'] == [0, 13, 4]
+    assert decode_entries(compact) == ENTRIES
+    assert decode_entries(encode_entries([])) == []
+
+def test_lossy_rows_are_left_alone():
+    print("🧪 Testing non-grid and extended rows fall back to the regular format")
+    extra = [dict(ENTRIES[0], program='CS')]
+    off_grid = [dict(ENTRIES[0], start_time_slot='07:15-07:45')]
+    long_day = [dict(ENTRIES[0], day='Monday')]
+    for rows in (extra, off_grid, long_day):
+        assert encode_entries(rows) is None
+        assert compact_payload(rows) is rows
+
+def test_compact_payload_and_negotiation():
+    print("🧪 Testing compact_payload and format negotiation")
+    saved = {'id': '1', 'name': 'Sem 1', 'schedule': ENTRIES}
+    compact = compact_payload(saved)
+    assert compact['id'] == '1' and compact['schedule']['format'] == 'compact-v1'
+    assert compact_payload({'error': 'x'}) == {'error': 'x'}
+    assert wants_compact('compact', None)
+    assert not wants_compact('json', COMPACT_MEDIA_TYPE)
+    assert wants_compact(None, f'{COMPACT_MEDIA_TYPE}, application/json;q=0.5')
+    assert not wants_compact(None, 'application/json')
+
+def test_storage_encoding():
+    print("🧪 Testing schedule blob storage encoding")
+    encoding, blob = encode_for_storage(ENTRIES)
+    assert encoding == STORAGE_COMPACT and decode_from_storage(encoding, blob) == ENTRIES
+    extended = [dict(ENTRIES[0], program='CS')]
+    assert encode_for_storage(extended) == (STORAGE_JSON, extended)
+    assert decode_from_storage(STORAGE_JSON, extended) == extended
+    # Legacy inline schedule_data has no encoding
+    assert decode_from_storage(None, ENTRIES) == ENTRIES and decode_from_storage(None, None) == []
+    try:
+        decode_from_storage('zstd', b'')
+        assert False, 'unknown encodings must be rejected'
+    except ValueError:
+        pass
+
+if __name__ == "__main__":
+    test_round_trip()
+    test_lossy_rows_are_left_alone()
+    test_compact_payload_and_negotiation()
+    test_storage_encoding()
+    print("✅ Compact schedule format tests passed!")
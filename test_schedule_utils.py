@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Test schedule helper functions (no database required)
+"""
+
+from schedule_utils import (
+    day_index,
+    schedule_content_hash,
+    schedule_entries,
+    schedule_entry_rows,
+    schedule_summary,
+    slot_index,
+    slot_label,
+)
+
+SAMPLE_SCHEDULE = [
+    {'section_id': 'CS1A', 'subject_code': 'CS1', 'subject_name': 'Intro to Computing', 'type': 'non_lab',
+     'teacher_name': 'Ana Cruz', 'room_id': 'Room 101', 'day': 'Mon', 'start_time_slot': '07:00-07:30', 'duration_slots': 3},
+    {'section_id': 'CS1A', 'subject_code': 'CS1', 'subject_name': 'Intro to Computing', 'type': 'non_lab',
+     'teacher_name': 'Ana Cruz', 'room_id': 'Room 101', 'day': 'Wed', 'start_time_slot': '07:00-07:30', 'duration_slots': 3},
+    {'section_id': 'CS1B', 'subject_code': 'CS2', 'subject_name': 'Programming 1', 'type': 'lab',
+     'teacher_name': 'Ben Reyes', 'room_id': 'Lab 1', 'day': 'Tue', 'start_time_slot': '09:00-09:30', 'duration_slots': 6},
+]
+
+def test_schedule_entries_accepts_generator_result():
+    print("🧪 Testing schedule_entries")
+    assert schedule_entries(SAMPLE_SCHEDULE) == SAMPLE_SCHEDULE
+    assert schedule_entries({'schedule': SAMPLE_SCHEDULE, 'logs': []}) == SAMPLE_SCHEDULE
+    assert schedule_entries(None) == []
+
+def test_content_hash_ignores_key_order():
+    print("🧪 Testing schedule_content_hash")
+    reordered = [dict(reversed(list(e.items()))) for e in SAMPLE_SCHEDULE]
+    assert schedule_content_hash(SAMPLE_SCHEDULE) == schedule_content_hash(reordered)
+    assert schedule_content_hash(SAMPLE_SCHEDULE) != schedule_content_hash(SAMPLE_SCHEDULE[:2])
+
+def test_schedule_summary_counts():
+    print("🧪 Testing schedule_summary")
+    summary = schedule_summary(SAMPLE_SCHEDULE)
+    assert summary['entry_count'] == 3
+    assert summary['section_count'] == 2
+    assert summary['teacher_count'] == 2
+    assert len(summary['content_hash']) == 64
+
+def test_entry_rows_use_integer_grid():
+    print("🧪 Testing schedule_entry_rows")
+    assert day_index('Mon') == 0 and day_index('Sat') == 5 and day_index('Sun') is None
+    assert slot_index('07:00-07:30') == 0 and slot_index('09:30-10:00') == 5 and slot_index('bad') is None
+    assert slot_label(5) == '09:30-10:00' and slot_index(slot_label(21)) == 21
+    assert slot_index('09:15') == 4 and slot_index('09:15', round_up=True) == 5
+    assert slot_index('09:00', round_up=True) == 4 and slot_index('06:45', round_up=True) is None
+    rows = schedule_entry_rows('S1', {'schedule': SAMPLE_SCHEDULE + [dict(SAMPLE_SCHEDULE[0], day='')]})
+    assert len(rows) == 3
+    assert rows[2] == ('S1', 2, 'CS1B', 'CS2', 'Programming 1', 'lab', 'Ben Reyes', 'Lab 1', 1, 4, 6)
+
+if __name__ == "__main__":
+    test_schedule_entries_accepts_generator_result()
+    test_content_hash_ignores_key_order()
+    test_schedule_summary_counts()
+    test_entry_rows_use_integer_grid()
+    print("✅ Schedule helper tests passed!")
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Test schedule version keys, diffs and delta encoding
+"""
+
+from schedule_codec import STORAGE_DELTA, decode_from_storage
+from schedule_utils import slot_label
+from schedule_versions import apply_delta, diff_schedules, make_delta, meeting_keys
+
+def entry(section, subject, kind='lecture', day='Mon', slot=0, room='Room 201'):
+    return {'section_id': section, 'subject_code': subject, 'subject_name': subject.title(), 'type': kind,
+            'teacher_name': 'Ana Cruz', 'room_id': room, 'day': day, 'start_time_slot': slot_label(slot),
+            'duration_slots': 3}
+
+BASE = [entry('CS1A', 'CS101', day='Mon'), entry('CS1A', 'CS101', day='Wed'),
+        entry('CS1A', 'CS101', 'lab', day='Fri', room='Lab 1')] + \
+       [entry(f'CS1{s}', f'CS{100 + n}', slot=n) for s in 'BC' for n in range(6)]
+
+def test_meeting_keys():
+    print("🧪 Testing meeting keys")
+    keys = meeting_keys(BASE[:3])
+    assert keys == [('CS1A', 'CS101', 'lecture', 0), ('CS1A', 'CS101', 'lecture', 1), ('CS1A', 'CS101', 'lab', 0)]
+
+def test_diff():
+    print("🧪 Testing diff_schedules")
+    new = [dict(e) for e in BASE]
+    new[1]['day'] = 'Thu'                 # moved
+    del new[2]                            # removed lab
+    new.append(entry('CS1D', 'CS200'))    # added
+    diff = diff_schedules(BASE, new)
+    assert diff['added'] == [entry('CS1D', 'CS200')]
+    assert diff['removed'] == [BASE[2]]
+    assert len(diff['moved']) == 1
+    moved = diff['moved'][0]
+    assert moved['key'] == {'section_id': 'CS1A', 'subject_code': 'CS101', 'type': 'lecture', 'meeting_index': 1}
+    assert moved['changes'] == ['day'] and moved['placement_changed']
+    assert diff['unchanged'] == len(BASE) - 2
+    assert diff_schedules(BASE, BASE) == {'added': [], 'removed': [], 'moved': [], 'unchanged': len(BASE)}
+
+def test_delta_round_trip():
+    print("🧪 Testing delta encoding")
+    new = [dict(e) for e in BASE]
+    new[4]['room_id'] = 'Room 305'
+    new.insert(7, entry('CS1D', 'CS200'))
+    delta = make_delta(BASE, new)
+    assert delta is not None and delta['count'] == len(new)
+    assert sum(1 for op in delta['ops'] if isinstance(op, dict)) == 2
+    assert apply_delta(BASE, delta) == new
+    assert decode_from_storage(STORAGE_DELTA, delta, BASE) == new
+    # Mostly rewritten versions are stored in full
+    assert make_delta(BASE, [dict(e, room_id='Gym') for e in BASE]) is None
+    assert make_delta(BASE, []) is None
+
+if __name__ == "__main__":
+    test_meeting_keys()
+    test_diff()
+    test_delta_round_trip()
+    print("✅ Schedule version tests passed!")
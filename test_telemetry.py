@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Test the write-behind telemetry buffer (no database required)
+"""
+
+import asyncio
+import threading
+import time
+from datetime import datetime, timezone
+
+from telemetry import BatchWriter, TelemetryWriter, activity_rollup_rows, group_batch
+
+class Recorder:
+    """Collects the batches handed to write_batch"""
+    def __init__(self, delay: float = 0.0):
+        self.batches = []
+        self.delay = delay
+
+    def __call__(self, batch):
+        time.sleep(self.delay)
+        self.batches.append(list(batch))
+
+def test_flushes_on_batch_size():
+    print("🧪 Testing size-triggered flush")
+    recorder = Recorder()
+    writer = BatchWriter(recorder, batch_size=3, flush_interval=60)
+    for i in range(7):
+        assert writer.submit('metric', ('m', i, None))
+    writer.flush()
+    assert [len(b) for b in recorder.batches] == [3, 3, 1]
+    assert [event[1][1] for b in recorder.batches for event in b] == [0, 1, 2, 3, 4, 5, 6]
+    writer.close()
+
+def test_flushes_on_interval():
+    print("🧪 Testing time-triggered flush")
+    recorder = Recorder()
+    writer = BatchWriter(recorder, batch_size=100, flush_interval=0.05)
+    writer.submit('activity', (1, 'login', 'x', None, None))
+    deadline = time.monotonic() + 2
+    while not recorder.batches and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert recorder.batches == [[('activity', (1, 'login', 'x', None, None))]]
+    writer.close()
+
+def test_close_flushes_and_backpressure_drops():
+    print("🧪 Testing shutdown flush and backpressure")
+    release = threading.Event()
+    batches = []
+    def slow_write(batch):
+        release.wait(2)
+        batches.append(batch)
+    writer = BatchWriter(slow_write, batch_size=1, flush_interval=60, queue_size=2, block_timeout=0.01)
+    results = [writer.submit('metric', ('m', i, None)) for i in range(6)]
+    assert results[:2] == [True, True] and not all(results)
+    assert writer.dropped == results.count(False)
+    release.set()
+    writer.close()
+    assert sum(len(b) for b in batches) == results.count(True)
+    assert writer.submit('metric', ('late', 0, None)) is False
+
+def test_event_loop_callers_never_block():
+    print("🧪 Testing non-blocking submit on the event loop")
+    release = threading.Event()
+    writer = BatchWriter(lambda batch: release.wait(2), batch_size=1, flush_interval=60,
+                         queue_size=1, block_timeout=5)
+
+    async def burst():
+        started = time.monotonic()
+        results = [writer.submit('metric', ('m', i, None)) for i in range(5)]
+        return results, time.monotonic() - started
+
+    results, elapsed = asyncio.run(burst())
+    assert elapsed < 1, elapsed
+    assert results[0] is True and not all(results)
+    assert writer.dropped == results.count(False)
+    release.set()
+    writer.close()
+
+def test_group_batch_by_kind():
+    print("🧪 Testing group_batch")
+    rows = group_batch([('metric', (1,)), ('activity', (2,)), ('metric', (3,))])
+    assert rows == {'metric': [(1,), (3,)], 'activity': [(2,)]}
+
+def test_activity_rollup_rows():
+    print("🧪 Testing activity_rollup_rows")
+    t1 = datetime(2026, 3, 1, 23, 59, 10, tzinfo=timezone.utc)
+    t2 = datetime(2026, 3, 2, 0, 0, 5, tzinfo=timezone.utc)
+    rows = [(1, 'login', 'a', None, None, t1), (1, 'login', 'b', None, None, t1.replace(second=40)),
+            (None, 'login', 'c', None, None, t1), (2, 'upload', 'd', None, None, t1),
+            (1, 'login', 'e', None, None, t2)]
+    minute = t1.replace(second=0)
+    assert sorted(activity_rollup_rows(rows)) == [
+        (minute, 'login', 0, 1), (minute, 'login', 1, 2), (minute, 'upload', 2, 1),
+        (t2.replace(second=0), 'login', 1, 1),
+    ]
+
+class FakeConnection:
+    """Records SQL and commits; stands in for a psycopg2 connection"""
+    def __init__(self):
+        self.statements = []
+        self.commits = 0
+        self.rollbacks = 0
+    def __enter__(self):
+        return self
+    def __exit__(self, *exc):
+        return False
+    def cursor(self):
+        return self
+    def execute(self, sql):
+        self.statements.append(sql)
+    def commit(self):
+        self.commits += 1
+    def rollback(self):
+        self.rollbacks += 1
+
+class FakeManager:
+    def __init__(self):
+        self.conn = FakeConnection()
+    def get_connection(self):
+        return self.conn
+
+def test_bad_row_only_drops_itself():
+    print("🧪 Testing row-by-row retry of a failed batch")
+    manager = FakeManager()
+    writer = TelemetryWriter(manager, batch_size=100, flush_interval=60)
+    written = []
+    def insert_rows(cursor, kind, rows):
+        if any(row[0] == 'bad' for row in rows):
+            raise ValueError("invalid input syntax")
+        written.extend(rows)
+    writer._insert_rows = insert_rows
+    batch = [('metric', ('ok1', 1, None)), ('metric', ('bad', 2, None)), ('metric', ('ok2', 3, None))]
+    writer._insert(batch)
+    assert written == [('ok1', 1, None), ('ok2', 3, None)]
+    assert writer.rejected == 1
+    assert manager.conn.rollbacks == 1 and manager.conn.commits == 1
+    assert manager.conn.statements.count("ROLLBACK TO SAVEPOINT telemetry_event") == 1
+    writer.close()
+
+def test_events_are_stamped_at_submit():
+    print("🧪 Testing created_at is recorded at submit time")
+    recorder = Recorder()
+    writer = TelemetryWriter(FakeManager(), batch_size=100, flush_interval=60)
+    writer.write_batch = recorder
+    before = datetime.now(timezone.utc)
+    writer.record_activity(1, 'login', 'x')
+    writer.record_metric('m', 1.0)
+    writer.flush()
+    (activity, metric), = recorder.batches
+    assert before <= activity[1][5] <= datetime.now(timezone.utc)
+    assert metric[1][3].tzinfo is not None
+    writer.close()
+
+if __name__ == "__main__":
+    test_flushes_on_batch_size()
+    test_flushes_on_interval()
+    test_close_flushes_and_backpressure_drops()
+    test_event_loop_callers_never_block()
+    test_group_batch_by_kind()
+    test_activity_rollup_rows()
+    test_bad_row_only_drops_itself()
+    test_events_are_stamped_at_submit()
+    print("✅ Telemetry buffer tests passed!")